@@ -1,22 +1,97 @@
 import os
+import re
 import json
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+import asyncio
+from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
 from pydantic import BaseModel
 
 from app.pipeline import CandidateEvaluationPipeline
 from app.video_interview import generate_interview_audio
+from app.github_fetcher import github_scheduler
+from app.gemini_evaluator import stage1_cache
+from app.batch_runner import BatchEvaluationRunner
+from app.model_cascade import stage1_cascade, stage4_cascade
+from app.llm_metrics import llm_metrics
+from app.embedding_cache import embedding_cache
+from app.qdrant_scorer import embedding_batcher, vector_writer, find_candidates
 
 app_router = APIRouter()
 
 # In-memory session storage (use Redis in production)
 session_storage = {}
 
+# Batch runs by batch_id (runner + background task)
+batch_runs = {}
+BATCH_OUTPUT_DIR = os.getenv("BATCH_OUTPUT_DIR", ".cache/batches")
+BATCH_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+
+async def run_until_disconnected(request: Request, coro, poll_interval: float = 0.5):
+    """
+    Runs coro but cancels it (and every model call inside it) as soon as
+    the HTTP client goes away, instead of finishing work nobody reads.
+    """
+    task = asyncio.ensure_future(coro)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                print("⚠️ Client disconnected - cancelling evaluation")
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def check_github_admission():
+    """
+    Admission control: don't start work that would only queue on GitHub
+    """
+    if not github_scheduler.has_capacity():
+        budget = github_scheduler.budget()
+        raise HTTPException(
+            status_code=503,
+            detail="GitHub API budget exhausted, please retry later",
+            headers={"Retry-After": str(int(budget["wait_seconds"]))},
+        )
+
+
+async def read_validated_resume(repo_link: str, resume_file: UploadFile) -> bytes:
+    """
+    Validates the Stage 1 inputs and returns the resume PDF bytes
+    """
+    if not repo_link.startswith("https://github.com/"):
+        raise ValueError("Invalid GitHub repository URL")
+    
+    if not resume_file.filename.endswith('.pdf'):
+        raise ValueError("Resume must be a PDF file")
+    
+    # Read resume PDF
+    resume_bytes = await resume_file.read()
+    
+    if len(resume_bytes) < 1000:  # Less than 1KB
+        raise ValueError("Resume file appears to be empty or corrupted")
+    
+    print(f"✅ Resume loaded: {len(resume_bytes)} bytes")
+    return resume_bytes
+
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 # ============ ENDPOINTS ============
 
 @app_router.post("/evaluate/start")
 async def start_evaluation(
+    request: Request,
     repo_link: str = Form(...),
     job_description: str = Form(...),
     ideal_candidate_profile: str = Form(...),
@@ -44,6 +119,8 @@ async def start_evaluation(
     - mcq_questions: List of 3 MCQ questions
     - Initial scores: code_quality, resume_fit, code_fit
     """
+    check_github_admission()
+
     try:
         print(f"\n{'='*70}")
         print(f"🚀 STARTING EVALUATION FOR CANDIDATE: {candidate_id}")
@@ -53,19 +130,7 @@ async def start_evaluation(
         print(f"📄 Resume: {resume_file.filename}")
         
         # Validate inputs
-        if not repo_link.startswith("https://github.com/"):
-            raise ValueError("Invalid GitHub repository URL")
-        
-        if not resume_file.filename.endswith('.pdf'):
-            raise ValueError("Resume must be a PDF file")
-        
-        # Read resume PDF
-        resume_bytes = await resume_file.read()
-        
-        if len(resume_bytes) < 1000:  # Less than 1KB
-            raise ValueError("Resume file appears to be empty or corrupted")
-        
-        print(f"✅ Resume loaded: {len(resume_bytes)} bytes")
+        resume_bytes = await read_validated_resume(repo_link, resume_file)
         
         # Initialize pipeline
         pipeline = CandidateEvaluationPipeline(
@@ -77,17 +142,20 @@ async def start_evaluation(
         )
         
         # RUN STAGE 1: Complete initial evaluation
-        stage1_results = pipeline.run_stage1(
-            repo_link=repo_link,
-            resume_bytes=resume_bytes
+        stage1_results = await run_until_disconnected(
+            request,
+            pipeline.run_stage1(
+                repo_link=repo_link,
+                resume_bytes=resume_bytes
+            )
         )
         
         # Generate audio for interview questions (optional enhancement)
         print(f"\n🔊 Generating TTS audio for interview questions...")
-        interview_audio = []
-        for question in stage1_results['interview_questions']:
-            audio_info = generate_interview_audio(question)
-            interview_audio.append(audio_info)
+        interview_audio = list(await asyncio.gather(*(
+            asyncio.to_thread(generate_interview_audio, question)
+            for question in stage1_results['interview_questions']
+        )))
         
         # Store pipeline in session for Stage 3
         session_storage[candidate_id] = pipeline
@@ -125,6 +193,9 @@ async def start_evaluation(
             "next_step": "Candidate should record video responses to interview_questions and answer mcq_questions"
         })
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
         print(f"❌ Validation error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -140,8 +211,92 @@ async def start_evaluation(
         raise HTTPException(status_code=500, detail=f"Evaluation start error: {str(e)}")
 
 
+@app_router.post("/evaluate/start/stream")
+async def start_evaluation_stream(
+    repo_link: str = Form(...),
+    job_description: str = Form(...),
+    ideal_candidate_profile: str = Form(...),
+    task_description: str = Form(...),
+    candidate_id: str = Form(...),
+    jd_id: str = Form(...),
+    resume_file: UploadFile = File(...)
+):
+    """
+    STAGE 1: Initial Evaluation as a Server-Sent Events stream
+    
+    Same inputs and work as /evaluate/start, but every artifact is pushed
+    as soon as it exists so the frontend can start the interview before
+    the slow tail (code fit, TTS) finishes.
+    
+    Events (data is JSON):
+    - started, code_quality, interview_question (one per question),
+      mcq_questions, resume_fit, code_fit, interview_audio (one per clip)
+    - complete: same payload as /evaluate/start minus interview_audio
+      (already streamed clip by clip), session is stored
+    - error: {"detail": "..."}, stream ends
+    """
+    check_github_admission()
+
+    try:
+        print(f"\n{'='*70}")
+        print(f"🚀 STARTING STREAMED EVALUATION FOR CANDIDATE: {candidate_id}")
+        print(f"{'='*70}")
+        
+        resume_bytes = await read_validated_resume(repo_link, resume_file)
+    except ValueError as e:
+        print(f"❌ Validation error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    pipeline = CandidateEvaluationPipeline(
+        jd_text=job_description,
+        ideal_candidate_profile=ideal_candidate_profile,
+        task_description=task_description,
+        candidate_id=candidate_id,
+        jd_id=jd_id
+    )
+    
+    async def event_stream():
+        yield sse_event("started", {"candidate_id": candidate_id, "jd_id": jd_id})
+        
+        # Starlette cancels this generator when the client disconnects,
+        # which cancels every pending model/TTS call in the pipeline
+        async for event, data in pipeline.run_stage1_stream(
+            repo_link=repo_link,
+            resume_bytes=resume_bytes
+        ):
+            if event == "complete":
+                # Store pipeline in session for Stage 3
+                session_storage[candidate_id] = pipeline
+                data = {
+                    "status": "success",
+                    "candidate_id": candidate_id,
+                    "jd_id": jd_id,
+                    "stage": "ready_for_interview",
+                    "code_quality_score": data['code_quality_score'],
+                    "code_description": data['code_description'],
+                    "interview_questions": data['interview_questions'],
+                    # interview_audio is left out: every clip was already
+                    # streamed on its own
+                    "mcq_questions": data['mcq_questions'],
+                    "scores_so_far": {
+                        "code_quality": data['code_quality_score'],
+                        "resume_fit": data['resume_fit_score'],
+                        "code_fit": data['code_fit_score']
+                    },
+                }
+            
+            yield sse_event(event, data)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app_router.post("/evaluate/submit-responses")
 async def submit_interview_responses(
+    request: Request,
     candidate_id: str = Form(...),
     interview_videos: List[UploadFile] = File(...),
     mcq_answers: str = Form(...)  # JSON string: ["A", "B", "C"]
@@ -209,9 +364,12 @@ async def submit_interview_responses(
             raise ValueError("Invalid MCQ answers format. Expected JSON array like [\"A\", \"B\", \"C\"]")
         
         # RUN STAGE 3: Transcribe, score, and analyze
-        final_results = pipeline.run_stage3(
-            interview_videos=video_data_list,
-            mcq_answers=mcq_answers_list
+        final_results = await run_until_disconnected(
+            request,
+            pipeline.run_stage3(
+                interview_videos=video_data_list,
+                mcq_answers=mcq_answers_list
+            )
         )
         
         # Clean up session
@@ -244,6 +402,9 @@ async def submit_interview_responses(
             "evaluation_complete": True
         })
         
+    except HTTPException:
+        raise
+    
     except ValueError as e:
         print(f"❌ Validation error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -293,6 +454,156 @@ async def cancel_evaluation(candidate_id: str):
     })
 
 
+@app_router.post("/batch/start")
+async def start_batch_evaluation(
+    manifest_file: UploadFile = File(...),
+    batch_id: str = Form(None)
+):
+    """
+    Start an offline Stage 1 batch for a whole job posting
+    
+    Input: manifest JSON (see app/batch_runner.py), resumes as resume_base64
+    Runs in the background; re-using a batch_id resumes that run's output.
+    """
+    try:
+        manifest = json.loads(await manifest_file.read())
+        if not isinstance(manifest, dict):
+            raise ValueError("Manifest must be a JSON object")
+        for field in ("jd_id", "job_description", "ideal_candidate_profile", "task_description", "candidates"):
+            if field not in manifest:
+                raise ValueError(f"Manifest is missing '{field}'")
+        if not isinstance(manifest["candidates"], list):
+            raise ValueError("'candidates' must be a list")
+
+        # Checked up front: a bad entry would otherwise fail mid-run
+        seen_ids = set()
+        for index, candidate in enumerate(manifest["candidates"]):
+            if not isinstance(candidate, dict):
+                raise ValueError(f"Candidate #{index} is not an object")
+            candidate_id = candidate.get("candidate_id")
+            if not isinstance(candidate_id, str) or not candidate_id:
+                raise ValueError(f"Candidate #{index} has no string candidate_id")
+            if candidate_id in seen_ids:
+                raise ValueError(f"Duplicate candidate_id {candidate_id}")
+            seen_ids.add(candidate_id)
+            repo_link = candidate.get("repo_link")
+            if not isinstance(repo_link, str) or not repo_link.startswith("https://github.com/"):
+                raise ValueError(f"Candidate {candidate_id} needs a repo_link starting with https://github.com/")
+            # Uploaded manifests never read server files (no resume_path)
+            if not candidate.get("resume_base64"):
+                raise ValueError(f"Candidate {candidate_id} has no resume_base64")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid manifest: {str(e)}")
+    
+    manifest.pop("_base_dir", None)
+    batch_id = batch_id or str(manifest["jd_id"])
+    
+    # batch_id names the output file: plain slugs only, no paths
+    if not BATCH_ID_PATTERN.fullmatch(batch_id):
+        raise HTTPException(status_code=400, detail="batch_id (or jd_id) may only contain letters, digits, '_' and '-'")
+    
+    if batch_id in batch_runs and batch_runs[batch_id]["runner"].state == "running":
+        raise HTTPException(status_code=409, detail=f"Batch {batch_id} is already running")
+    
+    os.makedirs(BATCH_OUTPUT_DIR, exist_ok=True)
+    output_path = os.path.join(BATCH_OUTPUT_DIR, f"{batch_id}.jsonl")
+    
+    runner = BatchEvaluationRunner(manifest, output_path)
+    task = asyncio.create_task(runner.run())
+    # Errors are reported through status(), don't log "never retrieved"
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    batch_runs[batch_id] = {"runner": runner, "task": task}
+    
+    return JSONResponse({
+        "status": "started",
+        "batch_id": batch_id,
+        "candidates": runner.total
+    })
+
+
+@app_router.get("/batch/status/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """
+    Progress and throughput (candidates/minute) of a batch run
+    """
+    if batch_id not in batch_runs:
+        return JSONResponse({
+            "status": "not_found",
+            "message": "No batch run with this id"
+        })
+    
+    return JSONResponse({
+        "status": "success",
+        "batch_id": batch_id,
+        **batch_runs[batch_id]["runner"].status()
+    })
+
+
+@app_router.get("/candidates/search")
+async def search_evaluated_candidates(
+    q: Optional[str] = None,
+    jd_id: Optional[str] = None,
+    recommendation: Optional[str] = None,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    min_code_quality: Optional[int] = None,
+    min_resume_fit: Optional[int] = None,
+    min_code_fit: Optional[int] = None,
+    min_mcq: Optional[int] = None,
+    min_video_interview: Optional[int] = None,
+    score_threshold: Optional[float] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+):
+    """
+    Search evaluated candidates
+    
+    q: rank by similarity to this text (e.g. the JD), omit to list
+    jd_id / recommendation (comma-separated) / score ranges: filters
+    score_threshold: minimum similarity (-1 to 1), only with q
+    cursor: next_cursor from the previous page
+    """
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    
+    score_ranges = {
+        field: (low, high)
+        for field, low, high in (
+            ("overall_score", min_score, max_score),
+            ("code_quality_score", min_code_quality, None),
+            ("resume_fit_score", min_resume_fit, None),
+            ("code_fit_score", min_code_fit, None),
+            ("mcq_score", min_mcq, None),
+            ("video_interview_score", min_video_interview, None),
+        )
+        if low is not None or high is not None
+    }
+    recommendations = [r.strip() for r in recommendation.split(",") if r.strip()] if recommendation else None
+    
+    try:
+        page = await asyncio.to_thread(
+            find_candidates,
+            query_text=q,
+            jd_id=jd_id,
+            recommendations=recommendations,
+            score_ranges=score_ranges,
+            score_threshold=score_threshold,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"❌ Candidate search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Candidate search failed: {str(e)}")
+    
+    return JSONResponse({
+        "status": "success",
+        "count": len(page["results"]),
+        **page
+    })
+
+
 @app_router.get("/health")
 async def health_check():
     """
@@ -300,5 +611,59 @@ async def health_check():
     """
     return JSONResponse({
         "status": "healthy",
-        "active_evaluations": len(session_storage)
-    })
\ No newline at end of file
+        "active_evaluations": len(session_storage),
+        "github_budget": github_scheduler.budget(),
+        "stage1_cache": stage1_cache.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_batcher": embedding_batcher.stats(),
+        "vector_writes": vector_writer.stats()
+    })
+
+
+@app_router.get("/admin/model-tiers")
+async def model_tier_stats():
+    """
+    Model cascade stats: calls, escalations and latency per tier
+    """
+    return JSONResponse({
+        "stage1": stage1_cascade.stats(),
+        "stage4": stage4_cascade.stats()
+    })
+
+
+@app_router.get("/admin/metrics")
+async def model_call_metrics(
+    group_by: str = "stage",
+    stage: Optional[str] = None,
+    model: Optional[str] = None,
+    jd_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    since: Optional[float] = None,
+    recent: int = 0
+):
+    """
+    Token, latency, retry, cache-hit and cost accounting for model and
+    embedding calls.
+
+    group_by: comma-separated stage, model, jd_id, candidate_id
+    since: unix timestamp
+    recent: also return the last N raw call records
+    """
+    filters = {"stage": stage, "model": model, "jd_id": jd_id, "candidate_id": candidate_id, "since": since}
+    fields = tuple(field.strip() for field in group_by.split(",") if field.strip())
+
+    try:
+        summary = llm_metrics.summary(group_by=fields, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response = {
+        "group_by": list(fields),
+        "filters": {k: v for k, v in filters.items() if v is not None},
+        "totals": llm_metrics.summary(group_by=(), **filters).get("all"),
+        "groups": summary
+    }
+    if recent > 0:
+        response["recent"] = llm_metrics.query(**filters)[-recent:]
+
+    return JSONResponse(response)
@@ -0,0 +1,304 @@
+"""
+Offline batch evaluation for a whole job posting.
+
+Manifest (JSON):
+{
+  "jd_id": "backend_senior_2025",
+  "job_description": "...",
+  "ideal_candidate_profile": "...",
+  "task_description": "...",
+  "candidates": [
+    {"candidate_id": "c1", "repo_link": "https://github.com/...", "resume_path": "resumes/c1.pdf"},
+    {"candidate_id": "c2", "repo_link": "https://github.com/...", "resume_base64": "..."}
+  ]
+}
+
+resume_path (relative to the manifest) is only read by the CLI; manifests
+uploaded to POST /api/batch/start must embed resumes as resume_base64.
+
+Results are appended to a JSONL file one candidate at a time; candidates
+already written there successfully are skipped, so a crashed run resumes
+where it stopped and failed candidates are retried.
+
+Usage:
+    python -m app.batch_runner manifest.json --output results.jsonl
+"""
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+from datetime import datetime
+from dotenv import load_dotenv
+
+from app.gemini_evaluator import stage1_evaluate_code_batch
+from app.qdrant_scorer import QdrantScorer
+from app.llm_metrics import set_metrics_context
+
+load_dotenv()
+
+# Candidates per Gemini batch job / per write-out
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 50))
+
+# Parallel resume/code-fit scorings (embedding calls)
+BATCH_SCORING_CONCURRENCY = int(os.getenv("BATCH_SCORING_CONCURRENCY", 8))
+
+
+# -----------------------------
+# Manifest / output helpers
+# -----------------------------
+def load_manifest(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    for field in ("jd_id", "job_description", "ideal_candidate_profile", "task_description", "candidates"):
+        if field not in manifest:
+            raise ValueError(f"Manifest is missing '{field}'")
+
+    manifest["_base_dir"] = os.path.dirname(os.path.abspath(path))
+    return manifest
+
+
+def load_completed_ids(output_path: str) -> set:
+    """
+    Candidate IDs already evaluated successfully by a previous (possibly
+    crashed) run; failed ones are evaluated again.
+    """
+    completed = set()
+
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record["status"] == "success":
+                    completed.add(record["candidate_id"])
+            except (ValueError, KeyError):
+                # Half-written last line from a crash
+                continue
+
+    return completed
+
+
+def read_resume(candidate: dict, base_dir: str = None) -> bytes:
+    """
+    base_dir: directory resume_path is relative to (CLI manifests); None
+    = uploaded manifest, only resume_base64 is accepted
+    """
+    if candidate.get("resume_base64"):
+        return base64.b64decode(candidate["resume_base64"])
+
+    if base_dir is None:
+        raise ValueError("resume_path is only supported for local manifests, send resume_base64")
+
+    path = candidate["resume_path"]
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# ==========================================================
+# 🏭 BATCH RUNNER
+# ==========================================================
+class BatchEvaluationRunner:
+    """
+    Runs Stage 1 (code evaluation + resume/code fit) for every candidate
+    of a manifest:
+
+    - repos are fetched concurrently
+    - Gemini work is submitted chunk by chunk as batch jobs
+    - each finished candidate is appended to output_path immediately
+    - progress and throughput (candidates/minute) via status()
+    """
+
+    def __init__(self, manifest: dict, output_path: str, chunk_size: int = BATCH_CHUNK_SIZE):
+        self.manifest = manifest
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+        self.qdrant_scorer = QdrantScorer()
+
+        self.total = len(manifest["candidates"])
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self.state = "pending"
+        self.error = None
+
+    # ------------------------------------------------------
+    # Status
+    # ------------------------------------------------------
+    def status(self) -> dict:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0
+        done = self.completed + self.failed
+
+        return {
+            "state": self.state,
+            "jd_id": self.manifest["jd_id"],
+            "total": self.total,
+            "skipped_already_done": self.skipped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "remaining": self.total - self.skipped - done,
+            "elapsed_seconds": round(elapsed, 1),
+            "candidates_per_minute": round(done / elapsed * 60, 2) if elapsed > 0 else None,
+            "output_path": self.output_path,
+            "error": self.error,
+        }
+
+    # ------------------------------------------------------
+    # Run
+    # ------------------------------------------------------
+    async def run(self) -> dict:
+        self.started_at = time.time()
+        self.state = "running"
+        set_metrics_context(jd_id=self.manifest["jd_id"])
+
+        try:
+            done_ids = load_completed_ids(self.output_path)
+            todo = [c for c in self.manifest["candidates"] if c["candidate_id"] not in done_ids]
+            self.skipped = self.total - len(todo)
+
+            if self.skipped:
+                print(f"↩️  Resuming: {self.skipped} candidates already in {self.output_path}")
+
+            for start in range(0, len(todo), self.chunk_size):
+                chunk = todo[start:start + self.chunk_size]
+                print(f"\n📦 Chunk {start // self.chunk_size + 1}: {len(chunk)} candidates")
+                await self._run_chunk(chunk)
+
+                status = self.status()
+                print(
+                    f"   📈 {status['completed'] + status['failed']}/{self.total - self.skipped} done, "
+                    f"{status['candidates_per_minute']} candidates/min"
+                )
+
+            self.state = "completed"
+
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"❌ Batch run failed: {e}")
+            raise
+
+        finally:
+            self.finished_at = time.time()
+
+        return self.status()
+
+    async def _run_chunk(self, chunk: list):
+        jd = self.manifest
+
+        stage1_results = await stage1_evaluate_code_batch(
+            [(c["repo_link"], jd["task_description"], jd["job_description"]) for c in chunk],
+            display_name=f"{jd['jd_id']}-{chunk[0]['candidate_id']}",
+        )
+
+        semaphore = asyncio.Semaphore(BATCH_SCORING_CONCURRENCY)
+
+        async def finish(candidate, stage1):
+            set_metrics_context(jd_id=jd["jd_id"], candidate_id=candidate["candidate_id"])
+            async with semaphore:
+                record = await self._score_candidate(candidate, stage1)
+            self._write(record)
+
+        # _score_candidate turns per-candidate errors into "failed" records;
+        # anything else (e.g. the output file) still aborts the run
+        await asyncio.gather(*(finish(c, r) for c, r in zip(chunk, stage1_results)))
+
+    async def _score_candidate(self, candidate: dict, stage1) -> dict:
+        jd = self.manifest
+        record = {
+            "candidate_id": candidate["candidate_id"],
+            "jd_id": jd["jd_id"],
+            "repo_link": candidate["repo_link"],
+            "evaluated_at": datetime.utcnow().isoformat(),
+        }
+
+        if isinstance(stage1, Exception):
+            record.update({"status": "failed", "error": str(stage1)})
+            return record
+
+        try:
+            resume_bytes = read_resume(candidate, jd.get("_base_dir"))
+
+            resume_fit_score, code_fit_score = await asyncio.gather(
+                asyncio.to_thread(
+                    self.qdrant_scorer.score_resume_fit,
+                    resume_bytes=resume_bytes,
+                    ideal_candidate_profile=jd["ideal_candidate_profile"],
+                    candidate_id=candidate["candidate_id"],
+                ),
+                asyncio.to_thread(
+                    self.qdrant_scorer.score_code_fit,
+                    code_description=stage1["code_description"],
+                    task_description=jd["task_description"],
+                    candidate_id=candidate["candidate_id"],
+                ),
+            )
+
+            record.update({
+                "status": "success",
+                "code_quality_score": stage1["code_quality_score"],
+                "code_description": stage1["code_description"],
+                "interview_questions": stage1["interview_questions"],
+                "mcq_questions": stage1["mcq_questions"],
+                "resume_fit_score": resume_fit_score,
+                "code_fit_score": code_fit_score,
+            })
+        except Exception as e:
+            record.update({"status": "failed", "error": str(e)})
+
+        return record
+
+    def _write(self, record: dict):
+        # One line per candidate, flushed to disk before moving on
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        if record["status"] == "success":
+            self.completed += 1
+            print(f"   ✅ {record['candidate_id']}: quality {record['code_quality_score']}, "
+                  f"resume fit {record['resume_fit_score']}, code fit {record['code_fit_score']}")
+        else:
+            self.failed += 1
+            print(f"   ❌ {record['candidate_id']}: {record['error']}")
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch Stage 1 evaluation for a job posting")
+    parser.add_argument("manifest", help="Path to the manifest JSON")
+    parser.add_argument("--output", help="Results JSONL (default: <jd_id>_results.jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    output_path = args.output or f"{manifest['jd_id']}_results.jsonl"
+
+    runner = BatchEvaluationRunner(manifest, output_path, chunk_size=args.chunk_size)
+    status = asyncio.run(runner.run())
+
+    print(f"\n{'='*60}")
+    print(f"✅ BATCH COMPLETE: {status['completed']} ok, {status['failed']} failed, "
+          f"{status['skipped_already_done']} skipped")
+    print(f"   ⏱️  {status['elapsed_seconds']}s, {status['candidates_per_minute']} candidates/min")
+    print(f"   💾 {output_path}")
+    print(f"{'='*60}")
+
+    return 0 if status["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
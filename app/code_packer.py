@@ -0,0 +1,196 @@
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+# Rough tokens per prompt (4 chars ~= 1 token for code)
+STAGE1_CODE_TOKEN_BUDGET = int(os.getenv("STAGE1_CODE_TOKEN_BUDGET", 6000))
+STAGE4_CODE_TOKEN_BUDGET = int(os.getenv("STAGE4_CODE_TOKEN_BUDGET", 2500))
+
+# Single files above this are dropped, they are almost never hand-written
+PACKER_MAX_FILE_CHARS = int(os.getenv("PACKER_MAX_FILE_CHARS", 60_000))
+
+CHARS_PER_TOKEN = 4
+
+SKIP_DIRS = {
+    "node_modules", "vendor", "third_party", "site-packages", ".git",
+    "dist", "build", "out", "target", "coverage", "__pycache__",
+    ".venv", "venv", "env", ".next", ".nuxt", ".idea", ".vscode",
+    ".pytest_cache", ".mypy_cache", "bower_components", "migrations",
+}
+
+SKIP_FILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock",
+    "Pipfile.lock", "Cargo.lock", "composer.lock", "Gemfile.lock",
+    "go.sum", "uv.lock", ".DS_Store",
+}
+
+SKIP_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg", ".webp",
+    ".pdf", ".zip", ".gz", ".tar", ".jar", ".class", ".exe", ".dll",
+    ".so", ".dylib", ".pyc", ".whl", ".mp3", ".mp4", ".mov", ".wav",
+    ".woff", ".woff2", ".ttf", ".eot", ".otf", ".ipynb", ".map",
+    ".csv", ".tsv", ".parquet", ".db", ".sqlite", ".pkl", ".npy", ".h5",
+}
+
+SOURCE_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".go", ".rs", ".rb",
+    ".php", ".c", ".cc", ".cpp", ".h", ".hpp", ".cs", ".kt", ".swift",
+    ".scala", ".sql", ".vue", ".svelte",
+}
+
+ENTRY_POINT_NAMES = {
+    "main", "app", "index", "server", "api", "solution", "manage", "cli",
+}
+
+_WORD_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]{2,}")
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "you",
+    "your", "should", "must", "will", "can", "all", "any", "each", "use",
+    "using", "into", "not", "have", "has", "return", "returns", "build",
+    "implement", "requirements", "task", "code", "handle",
+}
+
+
+# -----------------------------
+# Filtering
+# -----------------------------
+def is_packable(path: str, content: str) -> bool:
+    """
+    Drops binaries, lockfiles, vendored/generated dirs and oversized files.
+    """
+    parts = path.split("/")
+    name = parts[-1]
+    ext = os.path.splitext(name)[1].lower()
+
+    if any(part in SKIP_DIRS for part in parts[:-1]):
+        return False
+
+    if name in SKIP_FILES or ext in SKIP_EXTENSIONS:
+        return False
+
+    if name.endswith((".min.js", ".min.css", ".bundle.js")):
+        return False
+
+    if not content or len(content) > PACKER_MAX_FILE_CHARS:
+        return False
+
+    if "\0" in content[:2000]:
+        return False
+
+    return True
+
+
+# -----------------------------
+# Ranking
+# -----------------------------
+def _terms(text: str) -> set:
+    return {
+        word.lower()
+        for word in _WORD_RE.findall(text or "")
+        if word.lower() not in STOPWORDS
+    }
+
+
+def score_file(path: str, content: str, task_terms: set) -> float:
+    """
+    Relevance of one file to the task. Higher is better.
+    """
+    name = path.split("/")[-1]
+    stem, ext = os.path.splitext(name.lower())
+    depth = path.count("/")
+
+    score = 0.0
+
+    if ext in SOURCE_EXTENSIONS:
+        score += 3.0
+    if name.lower().startswith("readme"):
+        score += 4.0
+    if stem in ENTRY_POINT_NAMES:
+        score += 2.0
+    if "test" in path.lower():
+        score += 0.5
+
+    # Overlap with words of the task description
+    if task_terms:
+        path_terms = _terms(path.replace("/", " ").replace(".", " "))
+        content_terms = _terms(content[:20_000])
+        score += 3.0 * len(task_terms & path_terms)
+        score += 10.0 * len(task_terms & content_terms) / len(task_terms)
+
+    # Prefer shallow files, they are usually the core of a submission
+    score -= 0.5 * depth
+
+    return score
+
+
+# -----------------------------
+# Packing
+# -----------------------------
+def pack_repository(files: dict, task_description: str = "", token_budget: int = STAGE1_CODE_TOKEN_BUDGET) -> str:
+    """
+    Turns the {path: content} dict from fetch_github_code into ONE prompt
+    string that fits token_budget.
+
+    Layout (deterministic for the same input):
+
+        ===== FILE: path/to/file.py =====
+        <content>
+
+    Files are ordered by relevance to task_description; the last file that
+    does not fit is cut, everything after it is listed as omitted.
+    """
+    if not files:
+        return "[No readable files found in repository]"
+
+    task_terms = _terms(task_description)
+
+    ranked = sorted(
+        (
+            (score_file(path, content, task_terms), path)
+            for path, content in files.items()
+            if is_packable(path, content)
+        ),
+        key=lambda item: (-item[0], item[1]),
+    )
+
+    if not ranked:
+        return "[No readable source files found in repository]"
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    chunks = []
+    used = 0
+    omitted = []
+
+    for _, path in ranked:
+        header = f"===== FILE: {path} =====\n"
+        body = files[path].rstrip() + "\n"
+        remaining = budget_chars - used - len(header)
+
+        if remaining <= 200:
+            omitted.append(path)
+            continue
+
+        if len(body) > remaining:
+            body = body[:remaining] + "\n[... file truncated ...]\n"
+
+        chunks.append(header + body)
+        used += len(header) + len(body)
+
+    if omitted:
+        chunks.append(
+            f"===== OMITTED ({len(omitted)} lower-relevance files) =====\n"
+            + "\n".join(omitted[:50])
+            + "\n"
+        )
+
+    return "\n".join(chunks)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
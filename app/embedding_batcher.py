@@ -0,0 +1,153 @@
+import os
+import time
+import queue
+import threading
+import contextvars
+from concurrent.futures import Future
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+# How long the first pending text waits for company before a request goes out
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", 20))
+
+# The embedding API accepts at most 100 contents per request
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", 100))
+
+
+# ==========================================================
+# 📦 BATCHING EMBEDDER
+# ==========================================================
+class EmbeddingBatcher:
+    """
+    Collects texts from any thread (pipelines, to_thread workers, the
+    batch runner) for a short window and embeds them with one
+    multi-content request, then hands each caller its own vector.
+
+    embed_fn(texts) -> list of vectors in the same order. Identical texts
+    within one window are sent once.
+
+    record_fn(texts, wall_seconds, ok): optional, called once per caller
+    and request with the texts sent on that caller's behalf, inside the
+    caller's contextvars context (so per-job/candidate metrics stay
+    attributed even though the request runs on the batcher thread).
+    """
+
+    def __init__(
+        self,
+        embed_fn,
+        record_fn=None,
+        window_ms: float = EMBED_BATCH_WINDOW_MS,
+        max_size: int = EMBED_BATCH_MAX_SIZE,
+    ):
+        self.embed_fn = embed_fn
+        self.record_fn = record_fn
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+
+    def submit(self, texts: list) -> list:
+        """
+        Queues texts, returns one Future per text.
+        """
+        self._ensure_thread()
+        context = contextvars.copy_context()
+
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text, future, context))
+            futures.append(future)
+        return futures
+
+    def embed(self, texts: list, timeout: float = None) -> list:
+        """
+        Blocking helper: vectors for texts, raises the request's error.
+        """
+        return [future.result(timeout=timeout) for future in self.submit(texts)]
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.requests, 2) if self.requests else None,
+        }
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch: list):
+        # Same text requested twice in the window -> embedded once, and
+        # accounted to the first caller that asked for it
+        waiting = {}
+        owners = {}
+        for text, future, context in batch:
+            if future.set_running_or_notify_cancel():
+                waiting.setdefault(text, []).append(future)
+                owners.setdefault(text, context)
+
+        if not waiting:
+            return
+
+        texts = list(waiting)
+        self.requests += 1
+        self.texts += len(texts)
+
+        started = time.monotonic()
+        try:
+            vectors = self.embed_fn(texts)
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        except Exception as e:
+            self._record(owners, time.monotonic() - started, ok=False)
+            for futures in waiting.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        self._record(owners, time.monotonic() - started, ok=True)
+
+        for text, vector in zip(texts, vectors):
+            for future in waiting[text]:
+                future.set_result(vector)
+
+    def _record(self, owners: dict, wall_seconds: float, ok: bool):
+        if self.record_fn is None:
+            return
+
+        # Contexts are unhashable: group by identity
+        by_context = {}
+        for text, context in owners.items():
+            by_context.setdefault(id(context), (context, []))[1].append(text)
+
+        for context, texts in by_context.values():
+            try:
+                context.run(self.record_fn, texts, wall_seconds, ok)
+            except Exception as e:
+                print(f"   ⚠️ Embedding metrics error: {str(e)}")
@@ -0,0 +1,97 @@
+import os
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from app.result_cache import ResultCache
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+EMBEDDING_LRU_SIZE = int(os.getenv("EMBEDDING_LRU_SIZE", 2048))
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", 30 * 24 * 3600))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100000))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+
+
+# ==========================================================
+# 🧠 TWO-LEVEL EMBEDDING CACHE
+# ==========================================================
+class EmbeddingCache:
+    """
+    Embeddings keyed by hash(model, text, dims):
+
+    - L1: bounded in-process LRU (OrderedDict), no I/O
+    - L2: persistent SQLite store (ResultCache, namespace "embeddings"),
+      survives restarts and is shared by workers on the same disk
+
+    An L2 hit is promoted into L1. Each tier counts its own hits/misses.
+    """
+
+    def __init__(self, lru_size: int = EMBEDDING_LRU_SIZE, persistent: ResultCache = None):
+        self.lru_size = lru_size
+        self.persistent = persistent
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.lru_hits = 0
+        self.lru_misses = 0
+
+    @staticmethod
+    def make_key(model: str, text: str, dims: int) -> str:
+        return ResultCache.make_key(model, text, dims)
+
+    def get(self, key: str):
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.lru_hits += 1
+                return vector
+            self.lru_misses += 1
+
+        if self.persistent is None:
+            return None
+
+        vector = self.persistent.get(key)
+        if vector is not None:
+            self._remember(key, vector)
+        return vector
+
+    def set(self, key: str, vector: list):
+        self._remember(key, vector)
+        if self.persistent is not None:
+            self.persistent.set(key, vector)
+
+    def _remember(self, key: str, vector: list):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.lru_hits + self.lru_misses
+            memory = {
+                "entries": len(self._lru),
+                "max_entries": self.lru_size,
+                "hits": self.lru_hits,
+                "misses": self.lru_misses,
+                "hit_ratio": round(self.lru_hits / total, 3) if total else None,
+            }
+
+        return {
+            "memory": memory,
+            "persistent": self.persistent.stats() if self.persistent is not None else None,
+        }
+
+
+embedding_cache = EmbeddingCache(
+    persistent=ResultCache(
+        namespace="embeddings",
+        ttl=EMBEDDING_CACHE_TTL,
+        max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+    ) if EMBEDDING_CACHE_ENABLED else None,
+    lru_size=EMBEDDING_LRU_SIZE if EMBEDDING_CACHE_ENABLED else 0,
+)
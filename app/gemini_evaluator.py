@@ -1,19 +1,46 @@
 import os
+import copy
 import json
-from google import genai
+import time
+import hashlib
+import asyncio
 from google.genai import types
 from dotenv import load_dotenv
 from app.github_fetcher import fetch_github_code
+from app.code_packer import (
+    pack_repository,
+    estimate_tokens,
+    STAGE1_CODE_TOKEN_BUDGET,
+    STAGE4_CODE_TOKEN_BUDGET,
+)
+from app.result_cache import ResultCache
+from app.llm_client import llm_client
+from app.llm_metrics import llm_metrics
+from app.llm_backend import get_llm_backend
+from app.model_cascade import (
+    stage1_cascade,
+    stage4_cascade,
+    validate_stage1_part,
+    validate_stage4,
+)
 
 load_dotenv()
 
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-GENAI_MODEL = os.getenv("GENAI_MODEL", "gemini-2.0-flash")
+# Model calls go through get_llm_backend() (Gemini, or the fake backend
+# with LLM_BACKEND=fake), the client is created on first use.
+# Stage 1 and Stage 4 run on the model tiers of app.model_cascade
+# (GENAI_MODEL_TIERS), cheapest first
 
-if not GENAI_API_KEY:
-    raise ValueError("GENAI_API_KEY not found in environment variables")
+# Bump whenever the Stage 1 prompt or schema changes, old cache entries
+# then stop matching
+STAGE1_PROMPT_VERSION = "stage1-v1"
 
-client = genai.Client(api_key=GENAI_API_KEY)
+# Stage 1 results keyed by (packed code, task, JD, model tiers, prompt version)
+stage1_cache = ResultCache(
+    namespace="stage1",
+    ttl=float(os.getenv("STAGE1_CACHE_TTL", 7 * 24 * 3600)),
+    max_entries=int(os.getenv("STAGE1_CACHE_MAX_ENTRIES", 10000)),
+)
 
 # ============ STAGE 1: CODE EVALUATION SCHEMA ============
 STAGE1_SCHEMA = types.Schema(
@@ -49,6 +76,12 @@ STAGE1_SCHEMA = types.Schema(
     ],
 )
 
+# ============ STAGE 4: PAYLOAD ============
+# "1" = always send the resume PDF and re-fetched code (multimodal path),
+# "0" = build the prompt from Stage 1 artifacts (resume text, code digest)
+STAGE4_MULTIMODAL = os.getenv("STAGE4_MULTIMODAL", "0") == "1"
+STAGE4_RESUME_CHAR_LIMIT = int(os.getenv("STAGE4_RESUME_CHAR_LIMIT", 6000))
+
 # ============ STAGE 4: FINAL ANALYSIS SCHEMA ============
 STAGE4_SCHEMA = types.Schema(
     type=types.Type.OBJECT,
@@ -77,47 +110,41 @@ STAGE4_SCHEMA = types.Schema(
 )
 
 
-def stage1_evaluate_code(repo_link, task_description, jd_text):
-    """
-    STAGE 1: Gemini evaluates code from GitHub repo
-    NOW ACTUALLY FETCHES THE CODE FROM GITHUB
-    
-    Returns:
-    - code_quality_score (1-100)
-    - code_description (what the code achieves)
-    - interview_questions (5 specific questions about the code)
-    - mcq_questions (3 questions with options)
-    """
-    print("🤖 Gemini evaluating code from GitHub (Stage 1)...")
-
-    try:
-        # FETCH ACTUAL CODE FROM GITHUB
-        code_content = fetch_github_code(repo_link)
-        
-        # Truncate if too long (Gemini has token limits)
-        max_code_length = 15000
-        if len(code_content) > max_code_length:
-            code_content = code_content[:max_code_length] + "\n\n[... Code truncated for length ...]"
-        
-    except Exception as e:
-        print(f"❌ Could not fetch GitHub code: {str(e)}")
-        raise RuntimeError(f"GitHub fetch failed: {str(e)}")
-
-    prompt = f"""
-You are an expert code reviewer and interview question generator.
-
-TASK DESCRIPTION:
-{task_description}
+# ============ STAGE 1: SPLIT SUB-REQUEST SCHEMAS ============
+STAGE1_SCORE_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "code_quality_score": STAGE1_SCHEMA.properties["code_quality_score"],
+        "code_description": STAGE1_SCHEMA.properties["code_description"],
+    },
+    required=["code_quality_score", "code_description"],
+)
 
-JOB DESCRIPTION:
-{jd_text}
+STAGE1_QUESTIONS_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "interview_questions": STAGE1_SCHEMA.properties["interview_questions"],
+    },
+    required=["interview_questions"],
+)
 
-CANDIDATE'S CODE SUBMISSION:
-{code_content}
+STAGE1_MCQ_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "mcq_questions": STAGE1_SCHEMA.properties["mcq_questions"],
+    },
+    required=["mcq_questions"],
+)
 
-Please analyze this code submission and provide:
+# "1" = score, questions and MCQs as three concurrent calls: lower latency
+# to first question, but the packed code is sent three times (~3x Stage 1
+# input tokens) and results are cached apart from combined/batch ones.
+# Applies to the streamed endpoint as well.
+# "0" (default) = one combined call
+STAGE1_SPLIT = os.getenv("STAGE1_SPLIT", "0") == "1"
 
-1. **code_quality_score** (1-100): Rate the code based on:
+STAGE1_SCORE_INSTRUCTIONS = """
+**code_quality_score** (1-100): Rate the code based on:
    - Functionality (does it solve the task correctly? -> PENALIZE HEAVILY OF JOB DESCRIPTION)
    - Code structure and readability
    - Error handling and edge cases
@@ -125,9 +152,11 @@ Please analyze this code submission and provide:
    - Best practices and conventions
    - Documentation and comments
 
-2. **code_description**: Concise description (2-3 sentences) of what this code achieves and how it solves the problem
+**code_description**: Concise description (2-3 sentences) of what this code achieves and how it solves the problem
+"""
 
-3. **interview_questions**: Generate 5 specific interview questions about THIS EXACT CODE. Ask about:
+STAGE1_QUESTIONS_INSTRUCTIONS = """
+**interview_questions**: Generate 5 specific interview questions about THIS EXACT CODE. Ask about:
    - Their implementation choices and why they made them
    - How they would handle specific edge cases
    - Trade-offs they considered
@@ -135,29 +164,170 @@ Please analyze this code submission and provide:
    - How their solution relates to the job requirements
    
    Example: "I noticed you used a hash map in your solution. Can you explain why you chose this data structure over alternatives?"
+"""
 
-4. **mcq_questions**: Generate 3 multiple-choice questions testing:
+STAGE1_MCQ_INSTRUCTIONS = """
+**mcq_questions**: Generate 3 multiple-choice questions testing:
    - Understanding of the algorithm/approach used in THEIR code
    - Code correctness and functionality
    - Time/space complexity concepts
    
    Each question should have 4 options (A, B, C, D) and specify the correct_answer (e.g., "A")
+"""
 
+STAGE1_FALLBACK = {
+    "code_quality_score": 50,
+    "code_description": "Code repository was analyzed but full evaluation could not be completed",
+    "interview_questions": [
+        "Can you walk me through your overall approach to solving this problem?",
+        "What challenges did you face during implementation and how did you overcome them?",
+        "How would you optimize this solution for better performance?",
+        "Can you describe the time and space complexity of your solution?",
+        "How did you test your solution to ensure it handles edge cases?",
+    ],
+    "mcq_questions": [
+        {
+            "question": "What is the primary goal of the submitted code?",
+            "options": [
+                "To solve the coding task efficiently",
+                "To demonstrate framework knowledge",
+                "To create a web application",
+                "To process large datasets",
+            ],
+            "correct_answer": "A",
+        },
+        {
+            "question": "Which is most important in production code?",
+            "options": [
+                "Readability and maintainability",
+                "Using the latest frameworks",
+                "Minimizing lines of code",
+                "Adding many features",
+            ],
+            "correct_answer": "A",
+        },
+        {
+            "question": "What should you always consider when designing algorithms?",
+            "options": [
+                "Time and space complexity trade-offs",
+                "Using the most complex solution",
+                "Following coding trends",
+                "Maximizing code length",
+            ],
+            "correct_answer": "A",
+        },
+    ],
+}
+
+
+def _stage1_prompt(task_description, jd_text, code_content, instructions):
+    return f"""
+You are an expert code reviewer and interview question generator.
+
+TASK DESCRIPTION:
+{task_description}
+
+JOB DESCRIPTION:
+{jd_text}
+
+CANDIDATE'S CODE SUBMISSION:
+{code_content}
+
+Please analyze this code submission and provide:
+{instructions}
 Return valid JSON only, no markdown.
 """
 
+
+def _stage1_combined_prompt(task_description, jd_text, code_content):
+    return _stage1_prompt(
+        task_description,
+        jd_text,
+        code_content,
+        "\n1. " + STAGE1_SCORE_INSTRUCTIONS.strip()
+        + "\n\n2. " + STAGE1_QUESTIONS_INSTRUCTIONS.strip()
+        + "\n\n3. " + STAGE1_MCQ_INSTRUCTIONS.strip() + "\n",
+    )
+
+
+async def _stage1_load_code(repo_link, task_description):
+    """
+    Fetches the repo and packs it for the Stage 1 prompt.
+
+    Also returns a compact code digest (hash + small excerpt) that Stage 4
+    reuses instead of fetching and packing the repo again.
+    """
     try:
-        response = client.models.generate_content(
-            model=GENAI_MODEL,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=STAGE1_SCHEMA,
+        # FETCH ACTUAL CODE FROM GITHUB
+        files = await asyncio.to_thread(fetch_github_code, repo_link)
+        
+        # Pack the most task-relevant files into the token budget
+        code_content = pack_repository(files, task_description, STAGE1_CODE_TOKEN_BUDGET)
+        print(f"   📦 Packed {len(files)} files into ~{estimate_tokens(code_content)} tokens")
+        
+        code_digest = {
+            "sha256": hashlib.sha256(code_content.encode("utf-8")).hexdigest()[:16],
+            "file_count": len(files),
+            "excerpt": pack_repository(files, task_description, STAGE4_CODE_TOKEN_BUDGET),
+        }
+        return code_content, code_digest
+        
+    except Exception as e:
+        print(f"❌ Could not fetch GitHub code: {str(e)}")
+        raise RuntimeError(f"GitHub fetch failed: {str(e)}")
+
+
+def _stage1_cache_key(code_content, task_description, jd_text, split: bool):
+    # Same commit + task + JD + model + prompt (and mode actually used) =
+    # same evaluation
+    mode = "split" if split else "single"
+    return ResultCache.make_key(
+        code_content, task_description, jd_text, stage1_cascade.key, f"{STAGE1_PROMPT_VERSION}-{mode}"
+    )
+
+
+async def _stage1_call(prompt, schema, label, part="all", first_tier=0):
+    """
+    One Stage 1 call through the model cascade: the cheapest tier answers
+    unless its output fails validation for this part.
+    """
+    async def call_tier(model):
+        response = await llm_client.call(
+            model,
+            lambda: get_llm_backend().generate(
+                model,
+                [prompt],
+                schema=schema,
                 temperature=0.3,
             ),
+            label=f"{label} [{model}]",
+            stage="stage1",
         )
+        return json.loads(response.text)
+
+    return await stage1_cascade.run(
+        call_tier,
+        lambda result: validate_stage1_part(part, result),
+        first_tier=first_tier,
+    )
+
+
+async def _stage1_combined(code_content, task_description, jd_text):
+    """
+    Stage 1 as one combined call (cached). Returns the result dict, or
+    the fallback on errors.
+    """
+    cache_key = _stage1_cache_key(code_content, task_description, jd_text, split=False)
+    cached = stage1_cache.get(cache_key)
+    if cached is not None:
+        print(f"⚡ Stage 1 cache hit: Code quality = {cached['code_quality_score']}/100")
+        llm_metrics.record_cache_hit("stage1", label="Stage 1 cache")
+        return cached
+
+    prompt = _stage1_combined_prompt(task_description, jd_text, code_content)
 
-        result = json.loads(response.text)
+    try:
+        result = await _stage1_call(prompt, STAGE1_SCHEMA, label="Stage 1")
         
         # Validate scores
         result["code_quality_score"] = max(1, min(100, result.get("code_quality_score", 50)))
@@ -166,57 +336,251 @@ Return valid JSON only, no markdown.
         print(f"✅ Generated {len(result['interview_questions'])} interview questions")
         print(f"✅ Generated {len(result['mcq_questions'])} MCQ questions")
         
+        # Only real model output is cached, never the fallback below
+        stage1_cache.set(cache_key, result)
+        
         return result
 
     except Exception as e:
         print(f"❌ Gemini Stage 1 error: {str(e)}")
-        # Return fallback
-        return {
-            "code_quality_score": 50,
-            "code_description": "Code repository was analyzed but full evaluation could not be completed",
-            "interview_questions": [
-                "Can you walk me through your overall approach to solving this problem?",
-                "What challenges did you face during implementation and how did you overcome them?",
-                "How would you optimize this solution for better performance?",
-                "Can you describe the time and space complexity of your solution?",
-                "How did you test your solution to ensure it handles edge cases?",
-            ],
-            "mcq_questions": [
-                {
-                    "question": "What is the primary goal of the submitted code?",
-                    "options": [
-                        "To solve the coding task efficiently",
-                        "To demonstrate framework knowledge",
-                        "To create a web application",
-                        "To process large datasets",
-                    ],
-                    "correct_answer": "A",
-                },
-                {
-                    "question": "Which is most important in production code?",
-                    "options": [
-                        "Readability and maintainability",
-                        "Using the latest frameworks",
-                        "Minimizing lines of code",
-                        "Adding many features",
-                    ],
-                    "correct_answer": "A",
-                },
-                {
-                    "question": "What should you always consider when designing algorithms?",
-                    "options": [
-                        "Time and space complexity trade-offs",
-                        "Using the most complex solution",
-                        "Following coding trends",
-                        "Maximizing code length",
-                    ],
-                    "correct_answer": "A",
-                },
-            ],
+        return copy.deepcopy(STAGE1_FALLBACK)
+
+
+async def stage1_evaluate_code_stream(repo_link, task_description, jd_text):
+    """
+    STAGE 1 (streaming): yields each part as soon as it is ready:
+
+        ("code_digest", {"sha256": ..., "file_count": ..., "excerpt": ...})
+        ("score", {"code_quality_score": ..., "code_description": ...})
+        ("interview_questions", [...])
+        ("mcq_questions", [...])
+
+    code_digest always comes first (no model call). With STAGE1_SPLIT the
+    score/description, interview question and MCQ calls run concurrently
+    against the same packed code and the order depends on which finishes
+    first; otherwise one combined call answers and its parts are yielded
+    in the order above. A failed part yields its fallback value instead.
+    """
+    code_content, code_digest = await _stage1_load_code(repo_link, task_description)
+    yield "code_digest", code_digest
+
+    if not STAGE1_SPLIT:
+        print("🤖 Gemini evaluating code from GitHub (Stage 1)...")
+        result = await _stage1_combined(code_content, task_description, jd_text)
+        yield "score", {
+            "code_quality_score": result["code_quality_score"],
+            "code_description": result["code_description"],
+        }
+        yield "interview_questions", result["interview_questions"]
+        yield "mcq_questions", result["mcq_questions"]
+        return
+
+    print("🤖 Gemini evaluating code from GitHub (Stage 1, split)...")
+
+    cache_key = _stage1_cache_key(code_content, task_description, jd_text, split=True)
+    cached = stage1_cache.get(cache_key)
+    if cached is not None:
+        print(f"⚡ Stage 1 cache hit: Code quality = {cached['code_quality_score']}/100")
+        llm_metrics.record_cache_hit("stage1", label="Stage 1 cache")
+        yield "score", {
+            "code_quality_score": cached["code_quality_score"],
+            "code_description": cached["code_description"],
         }
+        yield "interview_questions", cached["interview_questions"]
+        yield "mcq_questions", cached["mcq_questions"]
+        return
+
+    async def run_part(part, instructions, schema):
+        prompt = _stage1_prompt(task_description, jd_text, code_content, instructions)
+        try:
+            result = await _stage1_call(prompt, schema, label=f"Stage 1 {part}", part=part)
+
+            if part == "score":
+                return part, {
+                    "code_quality_score": max(1, min(100, result.get("code_quality_score", 50))),
+                    "code_description": result["code_description"],
+                }, True
+            return part, result[part], True
+
+        except Exception as e:
+            print(f"❌ Gemini Stage 1 {part} error: {str(e)}")
+            if part == "score":
+                return part, {
+                    "code_quality_score": STAGE1_FALLBACK["code_quality_score"],
+                    "code_description": STAGE1_FALLBACK["code_description"],
+                }, False
+            return part, STAGE1_FALLBACK[part], False
+
+    tasks = [
+        asyncio.ensure_future(run_part("score", STAGE1_SCORE_INSTRUCTIONS, STAGE1_SCORE_SCHEMA)),
+        asyncio.ensure_future(run_part("interview_questions", STAGE1_QUESTIONS_INSTRUCTIONS, STAGE1_QUESTIONS_SCHEMA)),
+        asyncio.ensure_future(run_part("mcq_questions", STAGE1_MCQ_INSTRUCTIONS, STAGE1_MCQ_SCHEMA)),
+    ]
+
+    combined = {}
+    all_ok = True
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            part, data, ok = await next_done
+            all_ok = all_ok and ok
 
+            if part == "score":
+                combined.update(data)
+                print(f"✅ Stage 1 score ready: Code quality = {data['code_quality_score']}/100")
+            else:
+                combined[part] = data
+                print(f"✅ Stage 1 {part} ready ({len(data)})")
+
+            yield part, data
+    finally:
+        # Consumer stopped early (e.g. client disconnected)
+        for task in tasks:
+            task.cancel()
+
+    # Only real model output is cached, never the fallbacks
+    if all_ok:
+        stage1_cache.set(cache_key, combined)
+
+
+async def stage1_evaluate_code(repo_link, task_description, jd_text):
+    """
+    STAGE 1: Gemini evaluates code from GitHub repo
+    NOW ACTUALLY FETCHES THE CODE FROM GITHUB
+    
+    Returns:
+    - code_quality_score (1-100)
+    - code_description (what the code achieves)
+    - interview_questions (5 specific questions about the code)
+    - mcq_questions (3 questions with options)
+    """
+    if STAGE1_SPLIT:
+        result = {}
+        async for part, data in stage1_evaluate_code_stream(repo_link, task_description, jd_text):
+            if part == "score":
+                result.update(data)
+            else:
+                result[part] = data
+        return result
 
-def stage4_final_analysis(
+    code_content, code_digest = await _stage1_load_code(repo_link, task_description)
+    result = await _stage1_combined(code_content, task_description, jd_text)
+    return {**result, "code_digest": code_digest}
+
+
+async def stage1_evaluate_code_batch(items, display_name="stage1-batch"):
+    """
+    STAGE 1 for many candidates at once.
+
+    items: list of (repo_link, task_description, jd_text)
+    Returns one Stage 1 result per item, in order; items whose code
+    could not be fetched or whose answer failed validation are returned
+    as the Exception instead.
+
+    Cache hits are answered directly; the rest is submitted as ONE Gemini
+    batch job (no per-request overhead, batch pricing). If the batch API is
+    unavailable the misses fall back to concurrent online calls.
+    """
+    print(f"📦 Stage 1 batch: {len(items)} candidates")
+
+    codes = await asyncio.gather(
+        *(_stage1_load_code(repo_link, task) for repo_link, task, _ in items),
+        return_exceptions=True,
+    )
+
+    results = [None] * len(items)
+    misses = []
+
+    for i, ((repo_link, task, jd), loaded) in enumerate(zip(items, codes)):
+        if isinstance(loaded, Exception):
+            results[i] = loaded
+            continue
+
+        code, _ = loaded
+
+        cache_key = _stage1_cache_key(code, task, jd, split=False)
+        cached = stage1_cache.get(cache_key)
+        if cached is not None:
+            llm_metrics.record_cache_hit("stage1", label="Stage 1 cache")
+            results[i] = cached
+        else:
+            misses.append((i, cache_key, _stage1_combined_prompt(task, jd, code)))
+
+    print(f"   ⚡ {len(items) - len(misses)} cache hits / fetch errors, {len(misses)} to evaluate")
+
+    if not misses:
+        return results
+
+    # The batch job runs on the cheapest tier; items it gets wrong are
+    # retried online on the next tiers
+    try:
+        batch_started = time.monotonic()
+        batch = await get_llm_backend().run_batch(
+            stage1_cascade.tiers[0],
+            [prompt for _, _, prompt in misses],
+            schema=STAGE1_SCHEMA,
+            temperature=0.3,
+            display_name=display_name,
+        )
+        batch_seconds = time.monotonic() - batch_started
+
+        responses = []
+        for response in batch:
+            # Each item waited for the whole job
+            llm_metrics.record(
+                stage="stage1_batch",
+                model=stage1_cascade.tiers[0],
+                input_tokens=getattr(response, "input_tokens", 0),
+                output_tokens=getattr(response, "output_tokens", 0),
+                wall_seconds=batch_seconds,
+                ok=response is not None,
+                label=display_name,
+            )
+            try:
+                responses.append(json.loads(response.text))
+            except Exception:
+                responses.append(None)
+
+        rejected = [
+            n for n, response in enumerate(responses)
+            if response is None or validate_stage1_part("all", response) is not None
+        ]
+        if rejected and len(stage1_cascade.tiers) > 1:
+            print(f"   🪜 {len(rejected)} batch answers rejected, escalating online")
+            escalated = await asyncio.gather(
+                *(_stage1_call(misses[n][2], STAGE1_SCHEMA, label="Stage 1", first_tier=1) for n in rejected),
+                return_exceptions=True,
+            )
+            for n, response in zip(rejected, escalated):
+                responses[n] = response
+    except Exception as e:
+        print(f"⚠️ Gemini batch job unavailable, using online calls: {e}")
+        responses = await asyncio.gather(
+            *(_stage1_call(prompt, STAGE1_SCHEMA, label="Stage 1") for _, _, prompt in misses),
+            return_exceptions=True,
+        )
+
+    for (i, cache_key, _), response in zip(misses, responses):
+        if not isinstance(response, Exception):
+            reason = "no response" if response is None else validate_stage1_part("all", response)
+            if reason is not None:
+                response = ValueError(f"Invalid Stage 1 answer: {reason}")
+
+        if isinstance(response, Exception):
+            # Reported as a failure (not cached, not a fallback score), so
+            # a resumed batch run retries the candidate
+            print(f"❌ Gemini Stage 1 batch item {i} failed: {response}")
+            results[i] = response
+            continue
+
+        response["code_quality_score"] = max(1, min(100, response.get("code_quality_score", 50)))
+        stage1_cache.set(cache_key, response)
+        results[i] = response
+
+    return results
+
+
+async def stage4_final_analysis(
     jd_text,
     resume_bytes,
     repo_link,
@@ -227,24 +591,49 @@ def stage4_final_analysis(
     mcq_score,
     interview_questions,
     interview_transcripts,
+    resume_text=None,
+    code_description=None,
+    code_digest=None,
+    multimodal=None,
 ):
     """
     STAGE 4: Gemini comprehensive final analysis
-    Uses multimodal to analyze PDF resume
-    Fetches GitHub code again for context
+    
+    Default (slim): prompt is built from Stage 1 artifacts only - extracted
+    resume text, code description and the code digest excerpt. Nothing is
+    re-fetched and no PDF is uploaded.
+    
+    multimodal=True (or STAGE4_MULTIMODAL=1, or missing artifacts):
+    sends the resume PDF as a multimodal part and fetches the code again.
     
     Takes all scores and data, returns comprehensive evaluation
     """
-    print("🎯 Gemini generating final analysis (Stage 4)...")
-
-    # Fetch code again for context
-    try:
-        code_content = fetch_github_code(repo_link)
-        if len(code_content) > 10000:
-            code_content = code_content[:10000] + "\n\n[... truncated ...]"
-    except Exception as e:
-        print(f"⚠️ Could not fetch code for Stage 4: {str(e)}")
-        code_content = "[Code could not be fetched]"
+    if multimodal is None:
+        multimodal = STAGE4_MULTIMODAL
+    if not resume_text or not code_digest:
+        multimodal = True
+
+    print(f"🎯 Gemini generating final analysis (Stage 4, {'multimodal' if multimodal else 'slim'})...")
+
+    if multimodal:
+        # Fetch code again for context
+        try:
+            files = await asyncio.to_thread(fetch_github_code, repo_link)
+            code_content = pack_repository(files, task_description, STAGE4_CODE_TOKEN_BUDGET)
+        except Exception as e:
+            print(f"⚠️ Could not fetch code for Stage 4: {str(e)}")
+            code_content = "[Code could not be fetched]"
+        
+        resume_section = "(Attached as PDF)"
+        resume_source = "RESUME PDF provided"
+    else:
+        code_content = (
+            f"WHAT THE CODE DOES: {code_description or 'n/a'}\n"
+            f"(digest {code_digest['sha256']}, {code_digest['file_count']} files)\n\n"
+            f"{code_digest['excerpt']}"
+        )
+        resume_section = resume_text[:STAGE4_RESUME_CHAR_LIMIT]
+        resume_source = "RESUME TEXT"
 
     prompt = f"""
 You are an expert recruiter and technical hiring manager. Based on the following comprehensive evaluation data, provide a final assessment of this candidate.
@@ -264,6 +653,10 @@ JOB DESCRIPTION:
 TASK DESCRIPTION:
 {task_description}
 
+========== CANDIDATE'S RESUME ==========
+
+{resume_section}
+
 ========== CANDIDATE'S CODE ==========
 
 GITHUB REPOSITORY: {repo_link}
@@ -281,7 +674,7 @@ Candidate's Video Interview Responses (Transcribed):
 
 ========== YOUR TASK ==========
 
-Analyze the RESUME PDF provided, the candidate's CODE, and their INTERVIEW RESPONSES to provide:
+Analyze the {resume_source}, the candidate's CODE, and their INTERVIEW RESPONSES to provide:
 
 1. **video_interview_score** (1-100): Score the video interview responses based on:
    - Technical depth and accuracy of explanations
@@ -312,25 +705,28 @@ Analyze the RESUME PDF provided, the candidate's CODE, and their INTERVIEW RESPO
 Return valid JSON only, no markdown.
 """
 
-    try:
+    contents = [prompt]
+    if multimodal:
         # Send PDF resume with prompt
-        response = client.models.generate_content(
-            model=GENAI_MODEL,
-            contents=[
-                types.Part.from_bytes(
-                    data=resume_bytes,
-                    mime_type="application/pdf"
+        contents = [{"mime_type": "application/pdf", "data": resume_bytes}, prompt]
+
+    try:
+        async def call_tier(model):
+            response = await llm_client.call(
+                model,
+                lambda: get_llm_backend().generate(
+                    model,
+                    contents,
+                    schema=STAGE4_SCHEMA,
+                    temperature=0.4,
                 ),
-                prompt
-            ],
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=STAGE4_SCHEMA,
-                temperature=0.4,
-            ),
-        )
+                label=f"Stage 4 [{model}]",
+                stage="stage4",
+            )
+            return json.loads(response.text)
 
-        result = json.loads(response.text)
+        # Cheap tier first; borderline or inconsistent verdicts escalate
+        result = await stage4_cascade.run(call_tier, validate_stage4)
 
         # Ensure scores are valid
         result["video_interview_score"] = max(1, min(100, result.get("video_interview_score", 50)))
@@ -1,7 +1,15 @@
 import os
+import time
+import random
+import tarfile
+import threading
 import requests
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse, quote
 from dotenv import load_dotenv
+from app.repo_cache import repo_cache
+from app.repo_mirror import GITHUB_MIRROR_DIR, read_mirror_blobs
 
 # -----------------------------
 # GitHub API Authentication
@@ -10,14 +18,241 @@ load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
+# Optional pool of extra tokens (comma separated), rotated by the scheduler
+GITHUB_TOKENS = [
+    token.strip()
+    for token in os.getenv("GITHUB_TOKENS", "").split(",")
+    if token.strip()
+]
+if GITHUB_TOKEN and GITHUB_TOKEN not in GITHUB_TOKENS:
+    GITHUB_TOKENS.insert(0, GITHUB_TOKEN)
+
+# Overridable so the fetcher can run against a local stub server
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_RAW_URL = os.getenv("GITHUB_RAW_URL", "https://raw.githubusercontent.com").rstrip("/")
+
 HEADERS = {
     "Accept": "application/vnd.github+json",
     "User-Agent": "AI-Hiring-Pipeline",
 }
 
-# Add token if present (recommended)
-if GITHUB_TOKEN:
-    HEADERS["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+# How long a request may queue for a rate-limit reset before failing
+GITHUB_MAX_QUEUE_WAIT = float(os.getenv("GITHUB_MAX_QUEUE_WAIT", 120))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 5))
+
+# "tarball" downloads the whole ref in one request, "trees" lists the repo
+# with one recursive tree call and downloads blobs concurrently,
+# "contents" walks the Contents API folder by folder (slow, last fallback)
+GITHUB_FETCH_MODE = os.getenv("GITHUB_FETCH_MODE", "tarball")
+
+# Max parallel blob downloads (also the size of the connection pool)
+GITHUB_FETCH_CONCURRENCY = int(os.getenv("GITHUB_FETCH_CONCURRENCY", 16))
+
+# Files bigger than this are skipped (minified bundles, datasets, ...)
+MAX_FILE_BYTES = int(os.getenv("GITHUB_MAX_FILE_BYTES", 200_000))
+
+REQUEST_TIMEOUT = float(os.getenv("GITHUB_REQUEST_TIMEOUT", 30))
+
+
+# -----------------------------
+# Pooled HTTP session
+# -----------------------------
+# One keep-alive pool shared by every download instead of a fresh TCP/TLS
+# handshake per file
+session = requests.Session()
+session.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=GITHUB_FETCH_CONCURRENCY,
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+
+# ==========================================================
+# 🚦 RATE-LIMIT-AWARE REQUEST SCHEDULER
+# ==========================================================
+class _TokenState:
+    def __init__(self, token):
+        self.token = token
+        self.limit = None
+        self.remaining = None  # unknown until the first response
+        self.reset_at = 0.0
+        self.cooldown_until = 0.0  # secondary rate limit back-off
+
+    def available_at(self, now: float) -> float:
+        """
+        Earliest time this token can be used again.
+        """
+        ready = self.cooldown_until
+        if self.remaining is not None and self.remaining <= 0:
+            ready = max(ready, self.reset_at)
+        return max(now, ready)
+
+
+class GitHubRequestScheduler:
+    """
+    Sends every GitHub request through a pool of tokens:
+
+    - Tracks X-RateLimit-Remaining / X-RateLimit-Reset per token
+    - Picks the token with the most budget left (rotation)
+    - Backs off with jitter on secondary rate limits (403/429 + Retry-After)
+    - Queues callers until a token resets instead of failing them,
+      up to max_queue_wait seconds
+    """
+
+    def __init__(
+        self,
+        tokens=None,
+        http_session=None,
+        api_url: str = GITHUB_API_URL,
+        max_queue_wait: float = GITHUB_MAX_QUEUE_WAIT,
+        max_retries: int = GITHUB_MAX_RETRIES,
+    ):
+        # No token = anonymous requests (60/hour), still tracked
+        self._states = [_TokenState(token) for token in (tokens or [None])]
+        self.session = http_session or session
+        self.api_url = api_url
+        self.max_queue_wait = max_queue_wait
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------
+    def request(self, url: str, headers: dict = None, **kwargs) -> requests.Response:
+        """
+        GET with token rotation, back-off and queueing.
+        Returns the last response (callers keep their own status handling).
+        """
+        counted = url.startswith(self.api_url)
+        resp = None
+
+        for attempt in range(self.max_retries + 1):
+            state = self._acquire(counted)
+
+            request_headers = dict(headers or {})
+            if state.token:
+                request_headers["Authorization"] = f"Bearer {state.token}"
+
+            resp = self.session.get(url, headers=request_headers, **kwargs)
+            self._update(state, resp)
+
+            if not self._is_rate_limited(resp) or attempt == self.max_retries:
+                return resp
+
+            self._back_off(state, resp, attempt)
+            resp.close()
+            print(f"   🚦 GitHub rate-limited ({resp.status_code}), retrying (attempt {attempt + 1})")
+
+        return resp
+
+    def budget(self) -> dict:
+        """
+        Snapshot of the remaining request budget, for admission control.
+        """
+        now = time.time()
+        with self._cond:
+            known = [s.remaining for s in self._states if s.remaining is not None]
+            wait = min(s.available_at(now) for s in self._states) - now
+            return {
+                "tokens": len(self._states),
+                "remaining": sum(known) if known else None,
+                "limit": sum(s.limit or 0 for s in self._states) or None,
+                "next_reset_at": min((s.reset_at for s in self._states if s.reset_at), default=None),
+                "wait_seconds": round(max(0.0, wait), 1),
+            }
+
+    def has_capacity(self) -> bool:
+        """
+        False when a new request would queue longer than max_queue_wait.
+        """
+        return self.budget()["wait_seconds"] <= self.max_queue_wait
+
+    # ------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------
+    def _acquire(self, counted: bool) -> _TokenState:
+        deadline = time.time() + self.max_queue_wait
+
+        with self._cond:
+            while True:
+                now = time.time()
+                ready = [s for s in self._states if s.available_at(now) <= now]
+
+                if ready:
+                    # Unknown budget sorts first so every token gets probed
+                    state = max(
+                        ready,
+                        key=lambda s: float("inf") if s.remaining is None else s.remaining,
+                    )
+                    if counted and state.remaining is not None:
+                        # Reserve one request so concurrent callers spread out
+                        state.remaining -= 1
+                    return state
+
+                next_ready = min(s.available_at(now) for s in self._states)
+                if next_ready > deadline:
+                    raise RuntimeError(
+                        "GitHub rate limit exhausted for all tokens "
+                        f"(next reset in {int(next_ready - now)}s)"
+                    )
+
+                print(f"   ⏳ GitHub budget exhausted, queueing for {int(next_ready - now)}s")
+                self._cond.wait(timeout=next_ready - now)
+
+    def _update(self, state: _TokenState, resp: requests.Response):
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        reset = resp.headers.get("X-RateLimit-Reset")
+        limit = resp.headers.get("X-RateLimit-Limit")
+
+        with self._cond:
+            if remaining is not None:
+                state.remaining = int(remaining)
+            if reset is not None:
+                state.reset_at = float(reset)
+            if limit is not None:
+                state.limit = int(limit)
+            self._cond.notify_all()
+
+    @staticmethod
+    def _is_rate_limited(resp: requests.Response) -> bool:
+        if resp.status_code == 429:
+            return True
+        if resp.status_code != 403:
+            return False
+        if resp.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in resp.headers:
+            return True
+        # Secondary limits come back as 403 with an explanatory message
+        return "rate limit" in resp.text.lower()
+
+    def _back_off(self, state: _TokenState, resp: requests.Response, attempt: int):
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            # Primary limit: the token is parked until reset, rotation moves on
+            return
+
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = min(60.0, 2.0 ** attempt)
+
+        # Full jitter so parallel callers do not retry in lockstep
+        delay = delay + random.uniform(0, delay)
+
+        with self._cond:
+            state.cooldown_until = max(state.cooldown_until, time.time() + delay)
+            self._cond.notify_all()
+
+
+github_scheduler = GitHubRequestScheduler(tokens=GITHUB_TOKENS)
+
+
+def github_get(url: str, **kwargs) -> requests.Response:
+    """
+    Shortcut used by every fetcher below.
+    """
+    return github_scheduler.request(url, **kwargs)
 
 
 # -----------------------------
@@ -65,8 +300,8 @@ def fetch_repo_file_tree(owner: str, repo: str, branch: str, path: str = ""):
     - non-owner access
     """
 
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}?ref={branch}"
-    resp = requests.get(api_url, headers=HEADERS)
+    api_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/contents/{path}?ref={branch}"
+    resp = github_get(api_url, timeout=REQUEST_TIMEOUT)
 
     if resp.status_code == 403:
         raise RuntimeError(
@@ -91,7 +326,7 @@ def download_raw_file(raw_url: str) -> str:
     """
     Downloads raw GitHub file content.
     """
-    resp = requests.get(raw_url, headers=HEADERS)
+    resp = github_get(raw_url, timeout=REQUEST_TIMEOUT)
 
     if resp.status_code == 403:
         raise RuntimeError("GitHub raw file fetch blocked: Add GITHUB_TOKEN")
@@ -146,6 +381,235 @@ def fetch_github_repo(url: str) -> dict:
     return collected
 
 
+# -----------------------------
+# Fetch repo as a single tarball
+# -----------------------------
+def fetch_github_repo_tarball(url: str) -> dict:
+    """
+    Fetch an ENTIRE repo with ONE request:
+    downloads the tarball for the ref and extracts it while streaming,
+    keeping only small text files. Same output as fetch_github_repo().
+    """
+    print(f"📦 Fetching GitHub tarball: {url}")
+
+    owner, repo, branch, path = parse_github_repo_url(url)
+    api_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/tarball/{branch}"
+
+    # GitHub redirects to codeload; requests drops the auth header on the
+    # cross-host redirect, which is what we want
+    resp = github_get(api_url, stream=True, timeout=REQUEST_TIMEOUT)
+
+    if resp.status_code == 403:
+        raise RuntimeError("GitHub tarball fetch blocked: Missing/invalid token OR rate-limited")
+
+    if resp.status_code == 404:
+        raise RuntimeError("GitHub returned 404: Repo or branch not found")
+
+    if resp.status_code >= 400:
+        raise RuntimeError(f"GitHub error {resp.status_code}: {resp.text}")
+
+    prefix = path.strip("/") + "/" if path else ""
+    collected = {}
+
+    with resp:
+        resp.raw.decode_content = True
+
+        # "r|gz" reads the archive sequentially, nothing is buffered to disk
+        with tarfile.open(fileobj=resp.raw, mode="r|gz") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+
+                # Strip the "<owner>-<repo>-<sha>/" top-level folder
+                parts = member.name.split("/", 1)
+                if len(parts) < 2:
+                    continue
+                file_path = parts[1]
+
+                if prefix and not file_path.startswith(prefix):
+                    continue
+
+                if member.size > MAX_FILE_BYTES:
+                    continue
+
+                data = archive.extractfile(member).read()
+                content = _decode_text(data)
+                if content is None:
+                    continue
+
+                collected[file_path] = content
+
+    print(f"   ✅ Fetched {len(collected)} files successfully")
+
+    return collected
+
+
+# -----------------------------
+# Fetch repo via Git Trees API
+# -----------------------------
+def fetch_repo_tree_recursive(owner: str, repo: str, branch: str) -> list:
+    """
+    Lists EVERY file of the ref with a single recursive tree call.
+    """
+    api_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{quote(branch, safe='')}?recursive=1"
+    resp = github_get(api_url, timeout=REQUEST_TIMEOUT)
+
+    if resp.status_code == 403:
+        raise RuntimeError("GitHub tree fetch blocked: Missing/invalid token OR rate-limited")
+
+    if resp.status_code == 404:
+        raise RuntimeError("GitHub returned 404: Repo or branch not found")
+
+    if resp.status_code >= 400:
+        raise RuntimeError(f"GitHub error {resp.status_code}: {resp.text}")
+
+    data = resp.json()
+
+    if data.get("truncated"):
+        raise RuntimeError("GitHub tree listing truncated (repo too large for Trees API)")
+
+    return data.get("tree", [])
+
+
+def fetch_github_repo_trees(url: str) -> dict:
+    """
+    Fetch an ENTIRE repo with one tree listing + concurrent blob downloads.
+    Total time is roughly the slowest batch, not the sum of all files.
+    Same output as fetch_github_repo().
+    """
+    print(f"🌲 Fetching GitHub tree: {url}")
+
+    owner, repo, branch, path = parse_github_repo_url(url)
+    prefix = path.strip("/") + "/" if path else ""
+
+    blobs = [
+        node["path"]
+        for node in fetch_repo_tree_recursive(owner, repo, branch)
+        if node.get("type") == "blob"
+        and node.get("size", 0) <= MAX_FILE_BYTES
+        and node["path"].startswith(prefix)
+    ]
+
+    def download(file_path):
+        # raw.githubusercontent.com does not count against the API rate limit
+        raw_url = f"{GITHUB_RAW_URL}/{owner}/{repo}/{quote(branch)}/{quote(file_path)}"
+        resp = github_get(raw_url, timeout=REQUEST_TIMEOUT)
+
+        if resp.status_code != 200:
+            raise RuntimeError(f"Failed to download file {raw_url}: {resp.status_code}")
+
+        return file_path, _decode_text(resp.content)
+
+    collected = {}
+
+    with ThreadPoolExecutor(max_workers=GITHUB_FETCH_CONCURRENCY) as pool:
+        for file_path, content in pool.map(download, blobs):
+            if content is not None:
+                collected[file_path] = content
+
+    print(f"   ✅ Fetched {len(collected)} files successfully")
+
+    return collected
+
+
+# -----------------------------
+# Fetch repo from a local mirror
+# -----------------------------
+def fetch_github_repo_mirror(url: str) -> dict:
+    """
+    Fetch an ENTIRE repo from the local bare-git mirror (GITHUB_MIRROR_DIR).
+    New repos are cloned once, later calls only run an incremental fetch.
+    Same output as fetch_github_repo().
+    """
+    print(f"🪞 Reading GitHub repository from local mirror: {url}")
+
+    owner, repo, branch, path = parse_github_repo_url(url)
+    blobs = read_mirror_blobs(owner, repo, branch, path, max_file_bytes=MAX_FILE_BYTES)
+
+    collected = {}
+    for file_path, data in blobs.items():
+        content = _decode_text(data)
+        if content is not None:
+            collected[file_path] = content
+
+    print(f"   ✅ Read {len(collected)} files from mirror")
+
+    return collected
+
+
+def _decode_text(data: bytes):
+    """
+    Returns the file as text, or None for binary files.
+    """
+    if b"\0" in data[:8000]:
+        return None
+
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+# -----------------------------
+# Resolve branch -> commit SHA
+# -----------------------------
+def resolve_commit_sha(owner: str, repo: str, branch: str) -> str:
+    """
+    Resolves a branch/tag to its commit SHA.
+
+    Sends the last seen ETag as If-None-Match: an unchanged ref answers
+    304 with an empty body, which GitHub does not count against the
+    rate limit.
+    """
+    ref_key = f"{owner}/{repo}@{branch}".lower()
+    cached = repo_cache.get_ref(ref_key) if repo_cache else None
+
+    headers = {"Accept": "application/vnd.github.sha"}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    api_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits/{quote(branch, safe='')}"
+    resp = github_get(api_url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+    if resp.status_code == 304 and cached:
+        return cached["sha"]
+
+    if resp.status_code == 404:
+        raise RuntimeError("GitHub returned 404: Repo or branch not found")
+
+    if resp.status_code >= 400:
+        raise RuntimeError(f"GitHub error {resp.status_code} resolving {branch}")
+
+    sha = resp.text.strip()
+
+    if repo_cache and resp.headers.get("ETag"):
+        repo_cache.put_ref(ref_key, sha, resp.headers["ETag"])
+
+    return sha
+
+
+def _fetch_uncached(repo_url: str) -> dict:
+    """
+    Fetches the repo over the network (tarball -> trees -> Contents API walk).
+    """
+    fetchers = [
+        ("tarball", fetch_github_repo_tarball),
+        ("trees", fetch_github_repo_trees),
+    ]
+
+    # Start from the configured mode, fall through to the slower ones
+    names = [name for name, _ in fetchers]
+    start = names.index(GITHUB_FETCH_MODE) if GITHUB_FETCH_MODE in names else len(fetchers)
+
+    for name, fetcher in fetchers[start:]:
+        try:
+            return fetcher(repo_url)
+        except Exception as e:
+            print(f"⚠️ {name} fetch failed, falling back: {e}")
+
+    return fetch_github_repo(repo_url)
+
+
 # -----------------------------
 # MAIN API for your pipeline
 # -----------------------------
@@ -153,11 +617,44 @@ def fetch_github_code(repo_url: str) -> dict:
     """
     Wrapper for pipeline usage:
     - Validates URL
-    - Fetches entire repo
+    - Reads from the local mirror when GITHUB_MIRROR_DIR is set
+    - Resolves the branch to a commit SHA and serves repeats from the
+      on-disk repo cache
+    - Otherwise fetches entire repo (tarball -> trees -> Contents API walk)
     - Returns dict of files
     """
     try:
-        return fetch_github_repo(repo_url)
+        if GITHUB_MIRROR_DIR:
+            return fetch_github_repo_mirror(repo_url)
+
+        if not repo_cache:
+            return _fetch_uncached(repo_url)
+
+        owner, repo, branch, path = parse_github_repo_url(repo_url)
+
+        try:
+            sha = resolve_commit_sha(owner, repo, branch)
+        except Exception as e:
+            print(f"⚠️ Could not resolve commit SHA, skipping repo cache: {e}")
+            return _fetch_uncached(repo_url)
+
+        key = repo_cache.make_key(owner, repo, sha, path)
+        files = repo_cache.get(key)
+
+        if files is not None:
+            print(f"⚡ Repo cache hit: {owner}/{repo}@{sha[:7]} ({len(files)} files)")
+            return files
+
+        # Pin the fetch to the resolved SHA so the cache entry matches it exactly
+        pinned_url = f"https://github.com/{owner}/{repo}/tree/{sha}/{path}".rstrip("/")
+        files = _fetch_uncached(pinned_url)
+
+        try:
+            repo_cache.put(key, files)
+        except Exception as e:
+            print(f"⚠️ Could not write repo cache: {e}")
+
+        return files
     except Exception as e:
         print(f"❌ GitHub fetch error: {e}")
         raise RuntimeError(f"Failed to fetch code from GitHub: {e}")
@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import math
+import zlib
+import sqlite3
+import threading
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+LEXICAL_PATH = os.getenv("LEXICAL_PATH", ".cache/lexical.sqlite3")
+
+# BM25 parameters
+BM25_K1 = float(os.getenv("BM25_K1", 1.2))
+BM25_B = float(os.getenv("BM25_B", 0.75))
+
+# Reciprocal rank fusion constant (60 = the usual default)
+RRF_K = int(os.getenv("RRF_K", 60))
+
+# Keeps tech terms in one piece: c++, c#, node.js, ci/cd, scikit-learn
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./\-]*[a-z0-9+#]|[a-z0-9]")
+# Compound tokens also contribute their parts (python/fastapi -> python, fastapi)
+COMPOUND_SEPARATORS = re.compile(r"[./\-]")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+this to was were will with we you your our they their he she his her them who
+which what when where how all any can may must should would could not no do
+does did so than then there these those such into over under about also well
+very more most other some each per via using use used able strong good great
+experience experienced years year work working team role candidate candidates
+skills skill knowledge understanding ability plus etc including
+""".split())
+
+
+# ==========================================================
+# 🔤 TOKENS -> SPARSE TERMS
+# ==========================================================
+def tokenize(text: str) -> list:
+    """
+    Lowercased terms without stopwords, tech punctuation kept
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall((text or "").lower()):
+        terms.append(token)
+        parts = COMPOUND_SEPARATORS.split(token)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part)
+    return [term for term in terms if term not in STOPWORDS and not term.isdigit()]
+
+
+def term_id(term: str) -> int:
+    """
+    Stable uint32 id of a term (Qdrant sparse indices), same in every process
+    """
+    return zlib.crc32(term.encode("utf-8"))
+
+
+# ==========================================================
+# 📚 INCREMENTAL IDF TABLE (SQLITE)
+# ==========================================================
+class IdfTable:
+    """
+    Document frequencies of one corpus, updated as documents are indexed.
+
+    - add(doc_id, terms): re-adding a doc_id replaces its old terms, so
+      re-evaluations do not inflate frequencies
+    - idf(term): BM25 idf, ln(1 + (N - df + 0.5) / (df + 0.5))
+    - persisted in SQLite (LEXICAL_PATH): df counts, N and total length
+      are updated in place, one transaction per add, so every worker
+      sharing the file sees the same corpus; per-document term sets are
+      kept only to undo a replaced document
+    """
+
+    def __init__(self, name: str, path: str = LEXICAL_PATH):
+        self.name = name
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Autocommit mode: transactions are opened explicitly in add()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS idf_stats (
+                corpus TEXT PRIMARY KEY,
+                doc_count INTEGER NOT NULL,
+                total_length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS idf_df (
+                corpus TEXT NOT NULL,
+                term TEXT NOT NULL,
+                df INTEGER NOT NULL,
+                PRIMARY KEY (corpus, term)
+            );
+            CREATE TABLE IF NOT EXISTS idf_docs (
+                corpus TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                terms TEXT NOT NULL,
+                PRIMARY KEY (corpus, doc_id)
+            );
+            """
+        )
+
+    def _stats(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_count, total_length FROM idf_stats WHERE corpus = ?", (self.name,)
+            ).fetchone()
+        return row or (0, 0)
+
+    @property
+    def doc_count(self) -> int:
+        return self._stats()[0]
+
+    @property
+    def avg_length(self) -> float:
+        doc_count, total_length = self._stats()
+        return total_length / doc_count if doc_count else 0.0
+
+    def add(self, doc_id: str, terms: list):
+        unique = sorted(set(terms))
+
+        with self._lock:
+            # IMMEDIATE takes the write lock up front: concurrent workers
+            # queue here instead of interleaving read-modify-write
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = self._conn.execute(
+                    "SELECT length, terms FROM idf_docs WHERE corpus = ? AND doc_id = ?",
+                    (self.name, doc_id),
+                ).fetchone()
+
+                doc_delta, length_delta = 1, len(terms)
+                if old is not None:
+                    doc_delta, length_delta = 0, len(terms) - old[0]
+                    self._conn.executemany(
+                        "UPDATE idf_df SET df = df - 1 WHERE corpus = ? AND term = ?",
+                        [(self.name, term) for term in json.loads(old[1])],
+                    )
+                    self._conn.execute("DELETE FROM idf_df WHERE corpus = ? AND df <= 0", (self.name,))
+
+                self._conn.executemany(
+                    "INSERT INTO idf_df (corpus, term, df) VALUES (?, ?, 1) "
+                    "ON CONFLICT (corpus, term) DO UPDATE SET df = df + 1",
+                    [(self.name, term) for term in unique],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO idf_docs (corpus, doc_id, length, terms) VALUES (?, ?, ?, ?)",
+                    (self.name, doc_id, len(terms), json.dumps(unique)),
+                )
+                self._conn.execute(
+                    "INSERT INTO idf_stats (corpus, doc_count, total_length) VALUES (?, ?, ?) "
+                    "ON CONFLICT (corpus) DO UPDATE SET "
+                    "doc_count = doc_count + excluded.doc_count, "
+                    "total_length = total_length + excluded.total_length",
+                    (self.name, doc_delta, length_delta),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def document_frequencies(self, terms) -> dict:
+        """
+        {term: df} for the given terms (absent terms are left out)
+        """
+        terms = list(set(terms))
+        frequencies = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(terms), 500):
+                chunk = terms[i:i + 500]
+                frequencies.update(self._conn.execute(
+                    f"SELECT term, df FROM idf_df WHERE corpus = ? AND term IN ({','.join('?' * len(chunk))})",
+                    (self.name, *chunk),
+                ).fetchall())
+        return frequencies
+
+    @staticmethod
+    def _idf(df: int, doc_count: int) -> float:
+        return math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+    def idf(self, term: str) -> float:
+        return self._idf(self.document_frequencies([term]).get(term, 0), self.doc_count)
+
+    # ------------------------------------------------------
+    # Sparse vectors
+    # ------------------------------------------------------
+    def document_vector(self, terms: list) -> dict:
+        """
+        {term_id: BM25 term weight} of a document (no idf: the query side
+        carries it, so stored vectors stay valid as the corpus grows)
+        """
+        counts = Counter(terms)
+        avg_length = self.avg_length or len(terms) or 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / avg_length)
+        return {term_id(term): tf * (BM25_K1 + 1) / (tf + norm) for term, tf in counts.items()}
+
+    def query_vector(self, terms: list) -> dict:
+        """
+        {term_id: idf} of a query; dot product with a document vector = BM25
+        """
+        frequencies = self.document_frequencies(terms)
+        doc_count = self.doc_count
+        return {term_id(term): self._idf(frequencies.get(term, 0), doc_count) for term in set(terms)}
+
+
+# -----------------------------
+# One table per corpus
+# -----------------------------
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_idf_table(name: str) -> IdfTable:
+    with _tables_lock:
+        if name not in _tables:
+            _tables[name] = IdfTable(name)
+        return _tables[name]
+
+
+# ==========================================================
+# 🔀 RECIPROCAL RANK FUSION
+# ==========================================================
+def reciprocal_rank_fusion(rankings: list, key, k: int = RRF_K, limit: int = None) -> list:
+    """
+    rankings: lists of hits, each best first
+    key: function(hit) -> identity shared across the lists
+    Returns [(fused score, hit), ...] best first; a hit's score is
+    sum(1 / (k + rank)) over the lists it appears in
+    """
+    scores = {}
+    hits = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            identity = key(hit)
+            scores[identity] = scores.get(identity, 0.0) + 1.0 / (k + rank)
+            hits.setdefault(identity, hit)
+
+    fused = sorted(scores, key=scores.get, reverse=True)
+    if limit is not None:
+        fused = fused[:limit]
+    return [(scores[identity], hits[identity]) for identity in fused]
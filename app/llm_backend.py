@@ -0,0 +1,374 @@
+import os
+import json
+import random
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from app.model_cascade import expected_recommendation
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+# "gemini" (default) or "fake" (deterministic local backend for load tests)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+# Fake latency distribution, e.g. "fixed:0.5", "uniform:0.2,1.5",
+# "normal:1.0,0.3", "lognormal:0.0,0.5" (seconds)
+LLM_FAKE_LATENCY = os.getenv("LLM_FAKE_LATENCY", "uniform:0.2,1.0")
+LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", 42))
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+# ==========================================================
+# 🔌 BACKEND INTERFACE
+# ==========================================================
+class LLMBackend:
+    """
+    Everything the pipeline needs from a model provider.
+
+    contents: list of str (text) and {"mime_type": ..., "data": bytes}
+    (files: PDFs, videos). schema: google.genai types.Schema or None.
+    """
+
+    name = "base"
+
+    async def generate(
+        self,
+        model: str,
+        contents: list,
+        schema=None,
+        temperature: float = None,
+        max_output_tokens: int = None,
+        json_output: bool = False,
+    ) -> LLMResponse:
+        raise NotImplementedError
+
+    async def run_batch(self, model: str, prompts: list, schema=None, temperature: float = None, display_name: str = "batch") -> list:
+        """
+        Runs many text prompts as one batch job. Returns LLMResponse or
+        None per prompt, in order.
+        """
+        raise NotImplementedError
+
+    def embed(self, model: str, texts: list) -> list:
+        """
+        One embedding (list of floats) per text, in order. Blocking: the
+        embedding batcher calls it from a worker thread.
+        """
+        raise NotImplementedError
+
+
+# ==========================================================
+# ♊ GEMINI BACKEND (google-genai)
+# ==========================================================
+# Gemini batch job polling
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", 15))
+BATCH_JOB_TIMEOUT = float(os.getenv("BATCH_JOB_TIMEOUT", 24 * 3600))
+BATCH_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+_genai_client = None
+_genai_client_lock = threading.Lock()
+
+
+def create_genai_client(api_key: str = None):
+    from google import genai
+
+    api_key = api_key or os.getenv("GENAI_API_KEY")
+    if not api_key:
+        raise ValueError("GENAI_API_KEY not found in environment variables")
+    return genai.Client(api_key=api_key)
+
+
+def get_genai_client():
+    """
+    The one google-genai client of the process (generation, embeddings),
+    created on first use so imports stay fast and key-free.
+    """
+    global _genai_client
+
+    if _genai_client is None:
+        with _genai_client_lock:
+            if _genai_client is None:
+                _genai_client = create_genai_client()
+    return _genai_client
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Real backend. The SDK client is created on first use, so importing
+    the pipeline does not need an API key.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str = None):
+        # No explicit key -> share the process-wide client
+        self.api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_genai_client(self.api_key) if self.api_key else get_genai_client()
+        return self._client
+
+    def _config(self, schema, temperature, max_output_tokens, json_output):
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            response_mime_type="application/json" if (schema is not None or json_output) else None,
+            response_schema=schema,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        )
+
+    @staticmethod
+    def _parts(contents):
+        from google.genai import types
+
+        return [
+            types.Part.from_bytes(data=item["data"], mime_type=item["mime_type"])
+            if isinstance(item, dict) else item
+            for item in contents
+        ]
+
+    async def generate(self, model, contents, schema=None, temperature=None, max_output_tokens=None, json_output=False):
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=self._parts(contents),
+            config=self._config(schema, temperature, max_output_tokens, json_output),
+        )
+
+        usage = getattr(response, "usage_metadata", None)
+        return LLMResponse(
+            text=response.text or "",
+            model=model,
+            input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+    async def run_batch(self, model, prompts, schema=None, temperature=None, display_name="batch"):
+        job = await self.client.aio.batches.create(
+            model=model,
+            src=[
+                {
+                    "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                    "config": {
+                        "response_mime_type": "application/json",
+                        "response_schema": schema,
+                        "temperature": temperature,
+                    },
+                }
+                for prompt in prompts
+            ],
+            config={"display_name": display_name},
+        )
+        print(f"   🚚 Submitted Gemini batch job {job.name} ({len(prompts)} requests)")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + BATCH_JOB_TIMEOUT
+        while job.state.name not in BATCH_DONE_STATES:
+            if loop.time() > deadline:
+                raise RuntimeError(f"Gemini batch job {job.name} timed out")
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            job = await self.client.aio.batches.get(name=job.name)
+
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Gemini batch job {job.name} ended in {job.state.name}")
+
+        responses = []
+        for item in job.dest.inlined_responses:
+            if getattr(item, "response", None) is None:
+                responses.append(None)
+                continue
+            usage = getattr(item.response, "usage_metadata", None)
+            responses.append(LLMResponse(
+                text=item.response.text or "",
+                model=model,
+                input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+            ))
+
+        return responses
+
+    def embed(self, model, texts):
+        result = self.client.models.embed_content(model=model, contents=texts)
+        return [list(embedding.values) for embedding in result.embeddings]
+
+
+# ==========================================================
+# 🧪 FAKE BACKEND (load testing)
+# ==========================================================
+# Array lengths the real prompts ask for
+FAKE_ARRAY_LENGTHS = {
+    "interview_questions": 5,
+    "mcq_questions": 3,
+    "options": 4,
+    "strengths": 3,
+    "weaknesses": 2,
+}
+
+FAKE_RECOMMENDATIONS = ["Strong Hire", "Hire", "Maybe", "No Hire"]
+
+# Same size as the real embedding model's vectors
+FAKE_EMBEDDING_DIM = 768
+
+
+def parse_latency_spec(spec: str):
+    """
+    "uniform:0.2,1.0" -> function(rng) returning seconds
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()]
+
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic local backend: no network, schema-valid JSON, latency
+    drawn from a configurable distribution. Same prompt -> same answer,
+    so pipeline overhead can be measured without the real service.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: str = LLM_FAKE_LATENCY, seed: int = LLM_FAKE_SEED):
+        self.latency = parse_latency_spec(latency)
+        self.seed = seed
+        self._latency_rng = random.Random(seed)
+
+    def _rng_for(self, contents) -> random.Random:
+        digest = hashlib.sha256(str(self.seed).encode())
+        for item in contents:
+            digest.update(item if isinstance(item, bytes) else
+                          item["data"][:4096] if isinstance(item, dict) else
+                          str(item).encode("utf-8"))
+        return random.Random(digest.hexdigest())
+
+    async def generate(self, model, contents, schema=None, temperature=None, max_output_tokens=None, json_output=False):
+        await asyncio.sleep(self.latency(self._latency_rng))
+
+        rng = self._rng_for(contents)
+
+        if schema is not None:
+            text = json.dumps(self._value(schema, "", rng))
+        elif json_output:
+            text = json.dumps({"result": "fake"})
+        else:
+            # Free text: transcriptions and the like
+            words = ["I", "used", "a", "hash", "map", "to", "count", "frequencies",
+                     "then", "a", "heap", "for", "the", "top", "k", "elements"]
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(20, 80)))
+
+        input_chars = sum(len(c) if isinstance(c, str) else 258 for c in contents)
+        return LLMResponse(
+            text=text,
+            model=model,
+            input_tokens=input_chars // 4,
+            output_tokens=len(text) // 4,
+        )
+
+    async def run_batch(self, model, prompts, schema=None, temperature=None, display_name="batch"):
+        return list(await asyncio.gather(
+            *(self.generate(model, [prompt], schema=schema, temperature=temperature) for prompt in prompts)
+        ))
+
+    def embed(self, model, texts):
+        # Unit vectors seeded by the text: same text -> same vector
+        vectors = []
+        for text in texts:
+            rng = self._rng_for([text])
+            values = [rng.gauss(0.0, 1.0) for _ in range(FAKE_EMBEDDING_DIM)]
+            norm = sum(v * v for v in values) ** 0.5 or 1.0
+            vectors.append([v / norm for v in values])
+        return vectors
+
+    def _value(self, schema, name, rng):
+        schema_type = getattr(schema, "type", None)
+        schema_type = getattr(schema_type, "name", schema_type)
+        schema_type = str(schema_type).upper()
+
+        if schema_type == "OBJECT":
+            value = {
+                prop: self._value(sub, prop, rng)
+                for prop, sub in (schema.properties or {}).items()
+            }
+            # Stage 4: keep the recommendation consistent with the score,
+            # as validate_stage4 expects of a real answer
+            if "recommendation" in value and isinstance(value.get("overall_score"), int):
+                value["recommendation"] = expected_recommendation(value["overall_score"])
+            return value
+
+        if schema_type == "ARRAY":
+            count = FAKE_ARRAY_LENGTHS.get(name, 3)
+            return [self._value(schema.items, name, rng) for _ in range(count)]
+
+        if schema_type == "INTEGER":
+            # *_score fields are 1-100, per-answer ratings 1-10
+            return rng.randint(30, 95) if name.endswith("score") else rng.randint(1, 10)
+
+        if schema_type == "NUMBER":
+            return round(rng.uniform(0, 1), 3)
+
+        if schema_type == "BOOLEAN":
+            return rng.random() < 0.5
+
+        if name == "recommendation":
+            return rng.choice(FAKE_RECOMMENDATIONS)
+        if name == "correct_answer":
+            return rng.choice("ABCD")
+        return f"Fake {name or 'text'} {rng.randint(1000, 9999)}"
+
+
+# -----------------------------
+# Backend selection
+# -----------------------------
+_backend = None
+
+
+def get_llm_backend() -> LLMBackend:
+    global _backend
+
+    if _backend is None:
+        if LLM_BACKEND == "fake":
+            print(f"🧪 Using fake LLM backend (latency {LLM_FAKE_LATENCY})")
+            _backend = FakeLLMBackend()
+        else:
+            _backend = GeminiBackend()
+
+    return _backend
+
+
+def set_llm_backend(backend: LLMBackend):
+    """
+    Swap the backend at runtime (load tests, benchmarks).
+    """
+    global _backend
+    _backend = backend
@@ -0,0 +1,209 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from dotenv import load_dotenv
+from app.llm_metrics import llm_metrics
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+LLM_MAX_CONCURRENCY_PER_MODEL = int(os.getenv("LLM_MAX_CONCURRENCY_PER_MODEL", 8))
+
+# Deadline for one logical call, retries included
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", 90))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+
+# Retries may add at most this share of extra load (plus a small reserve)
+LLM_RETRY_BUDGET_RATIO = float(os.getenv("LLM_RETRY_BUDGET_RATIO", 0.2))
+LLM_RETRY_BUDGET_RESERVE = float(os.getenv("LLM_RETRY_BUDGET_RESERVE", 10))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMCallError(RuntimeError):
+    """Raised when a model call fails after deadline/retries."""
+
+
+# ==========================================================
+# 💰 RETRY BUDGET
+# ==========================================================
+class RetryBudget:
+    """
+    Token bucket shared by every call: each call deposits `ratio` tokens,
+    each retry withdraws one. During an outage retries stop at roughly
+    `ratio` of normal traffic instead of multiplying it.
+    """
+
+    def __init__(self, ratio: float = LLM_RETRY_BUDGET_RATIO, reserve: float = LLM_RETRY_BUDGET_RESERVE):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = reserve
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(self.reserve, self.balance + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self.balance >= 1:
+                self.balance -= 1
+                return True
+            return False
+
+
+# ==========================================================
+# 🤖 SHARED ASYNC MODEL CLIENT
+# ==========================================================
+class AsyncLLMClient:
+    """
+    Every model call goes through call():
+
+    - Global and per-model semaphores cap in-flight requests
+    - One deadline per call, covering all attempts
+    - Exponential back-off with jitter, limited by a shared RetryBudget
+    - Cancellation (e.g. client disconnect) propagates into the SDK call
+    - Every call is recorded in llm_metrics (tokens, wall/queue time, retries)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_concurrency_per_model: int = LLM_MAX_CONCURRENCY_PER_MODEL,
+        timeout: float = LLM_CALL_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_budget = RetryBudget()
+
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._per_model = {}
+
+    def _model_semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._per_model:
+            self._per_model[model] = asyncio.Semaphore(self.max_concurrency_per_model)
+        return self._per_model[model]
+
+    async def call(
+        self,
+        model: str,
+        make_call,
+        timeout: float = None,
+        max_retries: int = None,
+        label: str = "LLM",
+        stage: str = None,
+    ):
+        """
+        make_call: zero-argument function returning a fresh awaitable
+        (one per attempt), e.g. lambda: client.aio.models.generate_content(...)
+        stage: accounting bucket in llm_metrics (defaults to label)
+        """
+        started = time.monotonic()
+        timing = {"queue_seconds": 0.0, "retries": 0}
+        ok = False
+        response = None
+
+        try:
+            response = await self._call(model, make_call, timeout, max_retries, label, timing)
+            ok = True
+            return response
+        finally:
+            llm_metrics.record(
+                stage=stage or label,
+                model=model,
+                input_tokens=getattr(response, "input_tokens", 0),
+                output_tokens=getattr(response, "output_tokens", 0),
+                wall_seconds=time.monotonic() - started,
+                queue_seconds=timing["queue_seconds"],
+                retries=timing["retries"],
+                ok=ok,
+                label=label,
+            )
+
+    async def _call(self, model, make_call, timeout, max_retries, label, timing):
+        timeout = timeout or self.timeout
+        max_retries = self.max_retries if max_retries is None else max_retries
+        deadline = time.monotonic() + timeout
+
+        self.retry_budget.deposit()
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMCallError(f"{label} call exceeded its {timeout:.0f}s deadline")
+
+            try:
+                # Queueing on the semaphores counts against the deadline too
+                return await asyncio.wait_for(self._attempt(model, make_call, timing), timeout=remaining)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                if not self._is_retryable(e):
+                    raise LLMCallError(f"{label} call failed: {e}") from e
+
+                if attempt >= max_retries:
+                    raise LLMCallError(f"{label} call failed after {attempt + 1} attempts: {e}") from e
+
+                if not self.retry_budget.try_withdraw():
+                    raise LLMCallError(f"{label} call failed, retry budget exhausted: {e}") from e
+
+                delay = min(8.0, 0.5 * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)
+                if time.monotonic() + delay >= deadline:
+                    raise LLMCallError(f"{label} call failed, no time left to retry: {e}") from e
+
+                attempt += 1
+                timing["retries"] = attempt
+                print(f"   🔁 {label} attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, model: str, make_call, timing: dict):
+        queued_at = time.monotonic()
+        async with self._global, self._model_semaphore(model):
+            timing["queue_seconds"] += time.monotonic() - queued_at
+            return await make_call()
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """
+        Only transient failures are retried: timeouts, connection/transport
+        errors and RETRYABLE_STATUS. Everything else (missing API key,
+        4xx, schema/TypeError bugs) fails immediately.
+        """
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError) + _transport_errors()):
+            return True
+
+        status = getattr(error, "code", None) or getattr(error, "status_code", None)
+        return isinstance(status, int) and status in RETRYABLE_STATUS
+
+
+def _transport_errors() -> tuple:
+    """
+    Transport error types of the HTTP clients the SDK may use
+    """
+    errors = []
+    try:
+        import httpx
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    try:
+        import aiohttp
+        errors.append(aiohttp.ClientConnectionError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+llm_client = AsyncLLMClient()
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+# Most recent call records kept in memory for /admin/metrics
+LLM_METRICS_MAX_RECORDS = int(os.getenv("LLM_METRICS_MAX_RECORDS", 50000))
+
+# Optional JSONL file every record is appended to (empty = disabled)
+LLM_METRICS_LOG = os.getenv("LLM_METRICS_LOG", "")
+
+# USD per 1M tokens (input, output). Override with LLM_PRICES as JSON,
+# e.g. '{"gemini-2.0-flash": [0.10, 0.40]}'
+LLM_PRICES = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "models/text-embedding-004": (0.0, 0.0),
+}
+LLM_PRICES.update({
+    model: tuple(prices) for model, prices in json.loads(os.getenv("LLM_PRICES", "{}")).items()
+})
+
+# Who a call is made for. Set by the pipeline, inherited by every task and
+# to_thread() call started from there.
+current_jd_id = contextvars.ContextVar("current_jd_id", default=None)
+current_candidate_id = contextvars.ContextVar("current_candidate_id", default=None)
+
+GROUP_FIELDS = ("stage", "model", "jd_id", "candidate_id")
+
+
+def set_metrics_context(jd_id: str = None, candidate_id: str = None):
+    """
+    Attributes all following model calls in this context to a job/candidate.
+    """
+    current_jd_id.set(jd_id)
+    current_candidate_id.set(candidate_id)
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = LLM_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+# ==========================================================
+# 📊 PER-CALL ACCOUNTING
+# ==========================================================
+class LLMMetrics:
+    """
+    One record per model/embedding call (or cache hit that replaced one):
+    stage, model, tokens, wall time, queue time (waiting for a concurrency
+    slot), retries, cache hit, success, and the jd_id/candidate_id from
+    the current context.
+
+    summary() aggregates records by any of stage/model/jd_id/candidate_id.
+    """
+
+    def __init__(self, max_records: int = LLM_METRICS_MAX_RECORDS, log_path: str = LLM_METRICS_LOG):
+        self.records = deque(maxlen=max_records)
+        self.log_path = log_path
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        stage: str,
+        model: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        wall_seconds: float = 0.0,
+        queue_seconds: float = 0.0,
+        retries: int = 0,
+        cache_hit: bool = False,
+        ok: bool = True,
+        label: str = None,
+    ):
+        entry = {
+            "timestamp": time.time(),
+            "stage": stage,
+            "model": model,
+            "label": label or stage,
+            "jd_id": current_jd_id.get(),
+            "candidate_id": current_candidate_id.get(),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "wall_seconds": round(wall_seconds, 4),
+            "queue_seconds": round(queue_seconds, 4),
+            "retries": retries,
+            "cache_hit": cache_hit,
+            "ok": ok,
+            "cost_usd": call_cost(model, input_tokens, output_tokens),
+        }
+
+        with self._lock:
+            self.records.append(entry)
+
+            if self.log_path:
+                try:
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"⚠️ Could not write metrics log: {e}")
+
+    def record_cache_hit(self, stage: str, model: str = "cache", label: str = None):
+        self.record(stage=stage, model=model, cache_hit=True, label=label)
+
+    def query(self, stage=None, model=None, jd_id=None, candidate_id=None, since=None) -> list:
+        with self._lock:
+            records = list(self.records)
+
+        return [
+            r for r in records
+            if (stage is None or r["stage"] == stage)
+            and (model is None or r["model"] == model)
+            and (jd_id is None or r["jd_id"] == jd_id)
+            and (candidate_id is None or r["candidate_id"] == candidate_id)
+            and (since is None or r["timestamp"] >= since)
+        ]
+
+    def summary(self, group_by=("stage",), **filters) -> dict:
+        """
+        group_by: any of stage, model, jd_id, candidate_id
+        filters: see query()
+        """
+        for field in group_by:
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Cannot group by '{field}', use one of {GROUP_FIELDS}")
+
+        groups = {}
+        for r in self.query(**filters):
+            key = "|".join(str(r[field]) for field in group_by) if group_by else "all"
+            groups.setdefault(key, []).append(r)
+
+        return {key: self._aggregate(records) for key, records in sorted(groups.items())}
+
+    @staticmethod
+    def _aggregate(records: list) -> dict:
+        calls = [r for r in records if not r["cache_hit"]]
+        walls = sorted(r["wall_seconds"] for r in calls)
+
+        def percentile(p):
+            if not walls:
+                return None
+            return walls[min(len(walls) - 1, int(p * len(walls)))]
+
+        return {
+            "calls": len(calls),
+            "cache_hits": len(records) - len(calls),
+            "errors": sum(1 for r in calls if not r["ok"]),
+            "retries": sum(r["retries"] for r in calls),
+            "input_tokens": sum(r["input_tokens"] for r in calls),
+            "output_tokens": sum(r["output_tokens"] for r in calls),
+            "wall_seconds_total": round(sum(walls), 3),
+            "wall_seconds_avg": round(sum(walls) / len(walls), 3) if walls else None,
+            "wall_seconds_p95": percentile(0.95),
+            "queue_seconds_total": round(sum(r["queue_seconds"] for r in calls), 3),
+            "cost_usd": round(sum(r["cost_usd"] for r in calls), 6),
+        }
+
+
+llm_metrics = LLMMetrics()
@@ -0,0 +1,280 @@
+import os
+import json
+import threading
+import numpy as np
+from dotenv import load_dotenv
+from app import similarity
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", ".cache/vector_index")
+
+# Use HNSW (if hnswlib is installed) once an index holds this many
+# vectors; 0 = always exact
+LOCAL_INDEX_HNSW_THRESHOLD = int(os.getenv("LOCAL_INDEX_HNSW_THRESHOLD", 50000))
+LOCAL_INDEX_HNSW_EF = int(os.getenv("LOCAL_INDEX_HNSW_EF", 128))
+
+# Two-stage search: coarse candidates per requested result, reranked
+# with the full vectors
+SEARCH_RERANK_FACTOR = int(os.getenv("SEARCH_RERANK_FACTOR", 4))
+
+INITIAL_CAPACITY = 1024
+
+
+# ==========================================================
+# 🗂️ EMBEDDED VECTOR INDEX (NO QDRANT NEEDED)
+# ==========================================================
+class LocalVectorIndex:
+    """
+    Single-node vector index used when Qdrant is not configured.
+
+    - <name>-<dim>.f32: normalized float32 vectors, one row per point,
+      memory-mapped (grows by doubling)
+    - <name>-<dim>.coarse<coarse_dim>.f32: renormalized prefixes of the
+      same vectors, when coarse_dim is set
+    - <name>-<dim>.jsonl: payload sidecar, one line per write
+      {"row", "id", "payload", "sparse"}; the last line for a row wins
+    - search: exact top-k with one matrix-vector product, or HNSW
+      (hnswlib) past hnsw_threshold points when no filter is given.
+      With coarse vectors, candidates come from the coarse matrix and
+      are reranked with the full vectors.
+    - search_sparse: dot product of sparse (lexical) vectors through an
+      in-memory inverted index
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dim: int,
+        coarse_dim: int = None,
+        directory: str = LOCAL_INDEX_DIR,
+        hnsw_threshold: int = LOCAL_INDEX_HNSW_THRESHOLD,
+    ):
+        self.name = name
+        self.dim = dim
+        self.coarse_dim = coarse_dim if coarse_dim and coarse_dim < dim else None
+        self.hnsw_threshold = hnsw_threshold
+        self.vectors_path = os.path.join(directory, f"{name}-{dim}.f32")
+        self.coarse_path = os.path.join(directory, f"{name}-{dim}.coarse{self.coarse_dim}.f32")
+        self.payloads_path = os.path.join(directory, f"{name}-{dim}.jsonl")
+
+        self.ids = []
+        self.payloads = []
+        self.rows = {}
+        self.sparse = {}
+        self.postings = {}
+        self._lock = threading.RLock()
+        self._hnsw = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------
+    def _load(self):
+        if os.path.exists(self.payloads_path):
+            with open(self.payloads_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Half-written last line from a crash
+                        continue
+                    self._set_meta(entry["row"], entry["id"], entry["payload"])
+                    self._set_sparse(entry["row"], dict(entry.get("sparse") or []))
+
+        # The vector is written before its sidecar line, so every row
+        # listed in the sidecar has its vector in the file
+        row_bytes = self.dim * 4
+        stored_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        self._open(max(INITIAL_CAPACITY, stored_rows, len(self.ids)))
+
+    def _open(self, capacity: int):
+        self.capacity = capacity
+        self.matrix = self._map(self.vectors_path, capacity, self.dim)
+        self.coarse = None
+
+        if self.coarse_dim:
+            fresh = not os.path.exists(self.coarse_path)
+            self.coarse = self._map(self.coarse_path, capacity, self.coarse_dim)
+            if fresh and self.ids:
+                # Coarse resolution added/changed: derive it from the full vectors
+                count = len(self.ids)
+                self.coarse[:count] = similarity.normalize(self.matrix[:count, :self.coarse_dim])
+
+    @staticmethod
+    def _map(path: str, capacity: int, dim: int):
+        size = capacity * dim * 4
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+
+    def _set_meta(self, row, point_id, payload):
+        while len(self.ids) <= row:
+            self.ids.append(None)
+            self.payloads.append(None)
+        self.ids[row] = point_id
+        self.payloads[row] = payload
+        self.rows[point_id] = row
+
+    def _set_sparse(self, row, sparse: dict):
+        for term in self.sparse.pop(row, {}):
+            self.postings[term].pop(row, None)
+        if sparse:
+            self.sparse[row] = sparse
+            for term, weight in sparse.items():
+                self.postings.setdefault(term, {})[row] = weight
+
+    # ------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------
+    def upsert(self, point_id, vector, payload: dict = None, sparse: dict = None):
+        """
+        Adds a point or replaces the one with the same id
+        sparse: optional {term id: weight} lexical vector
+        """
+        vector = similarity.normalize(np.asarray(vector, dtype=np.float32).reshape(self.dim))
+
+        with self._lock:
+            row = self.rows.get(point_id)
+            if row is None:
+                row = len(self.ids)
+                if row >= self.capacity:
+                    self.matrix.flush()
+                    if self.coarse is not None:
+                        self.coarse.flush()
+                    self._open(self.capacity * 2)
+
+            # Page cache writes survive a process crash, no msync per point
+            self.matrix[row] = vector
+            if self.coarse is not None:
+                self.coarse[row] = similarity.normalize(vector[:self.coarse_dim])
+
+            with open(self.payloads_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "row": row,
+                    "id": point_id,
+                    "payload": payload or {},
+                    "sparse": list((sparse or {}).items()),
+                }) + "\n")
+
+            self._set_meta(row, point_id, payload or {})
+            self._set_sparse(row, sparse or {})
+
+            if self._hnsw is not None:
+                if len(self.ids) > self._hnsw.get_max_elements():
+                    self._hnsw.resize_index(len(self.ids) * 2)
+                # An existing label is updated in place
+                self._hnsw.add_items(self._candidate_matrix()[row:row + 1], np.array([row]))
+
+        return point_id
+
+    # ------------------------------------------------------
+    # Search
+    # ------------------------------------------------------
+    def _candidate_matrix(self):
+        return self.coarse if self.coarse is not None else self.matrix
+
+    def search(self, vector, limit: int = 10, where=None, score_threshold: float = None, rerank_factor: int = SEARCH_RERANK_FACTOR) -> list:
+        """
+        [{"id", "score", "payload"}, ...] best first, scored with the
+        full vectors
+        where: optional function(payload) -> bool
+        """
+        query = similarity.normalize(np.asarray(vector, dtype=np.float32).reshape(self.dim))
+        two_stage = self.coarse is not None
+        fetch = limit * rerank_factor if two_stage else limit
+        candidate_query = similarity.normalize(query[:self.coarse_dim]) if two_stage else query
+
+        with self._lock:
+            count = len(self.ids)
+            if count == 0:
+                return []
+
+            if where is None and self._use_hnsw(count):
+                rows, scores = self._search_hnsw(candidate_query, fetch)
+            else:
+                scores = np.asarray(self._candidate_matrix()[:count] @ candidate_query)
+                if where is not None:
+                    allowed = np.fromiter((where(p) for p in self.payloads[:count]), dtype=bool, count=count)
+                    scores = np.where(allowed, scores, -np.inf)
+                rows, scores = similarity.top_k(scores, fetch)
+
+            if two_stage:
+                # Rerank the coarse candidates with the full vectors
+                rows = rows[np.isfinite(scores)]
+                full_scores = np.asarray(self.matrix[rows] @ query)
+                order, scores = similarity.top_k(full_scores, limit)
+                rows = rows[order]
+
+            hits = []
+            for row, score in zip(rows, scores):
+                score = float(score)
+                if not np.isfinite(score) or (score_threshold is not None and score < score_threshold):
+                    continue
+                hits.append({"id": self.ids[row], "score": score, "payload": self.payloads[row]})
+            return hits
+
+    def search_sparse(self, query: dict, limit: int = 10, where=None) -> list:
+        """
+        [{"id", "score", "payload"}, ...] best first by sparse dot product
+        query: {term id: weight}; points sharing no term are not returned
+        """
+        with self._lock:
+            scores = {}
+            for term, weight in query.items():
+                for row, value in self.postings.get(term, {}).items():
+                    scores[row] = scores.get(row, 0.0) + weight * value
+
+            if where is not None:
+                scores = {row: score for row, score in scores.items() if where(self.payloads[row])}
+
+            best = sorted(scores, key=scores.get, reverse=True)[:limit]
+            return [{"id": self.ids[row], "score": scores[row], "payload": self.payloads[row]} for row in best]
+
+    def _use_hnsw(self, count: int) -> bool:
+        if not self.hnsw_threshold or count < self.hnsw_threshold:
+            return False
+        try:
+            import hnswlib  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _search_hnsw(self, query, limit: int):
+        import hnswlib
+
+        count = len(self.ids)
+        if self._hnsw is None:
+            print(f"   🕸️ Building HNSW index for '{self.name}' ({count} vectors)")
+            matrix = self._candidate_matrix()
+            self._hnsw = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            self._hnsw.init_index(max_elements=max(count * 2, INITIAL_CAPACITY))
+            self._hnsw.add_items(np.asarray(matrix[:count]), np.arange(count))
+
+        self._hnsw.set_ef(max(LOCAL_INDEX_HNSW_EF, limit))
+        labels, distances = self._hnsw.knn_query(query.reshape(1, -1), k=min(limit, count))
+        # "ip" distance is 1 - dot product
+        return labels[0], 1.0 - distances[0]
+
+
+# -----------------------------
+# One index per collection
+# -----------------------------
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_index(name: str, dim: int, coarse_dim: int = None) -> LocalVectorIndex:
+    with _indexes_lock:
+        if name not in _indexes:
+            _indexes[name] = LocalVectorIndex(name, dim, coarse_dim=coarse_dim)
+        return _indexes[name]
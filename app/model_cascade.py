@@ -0,0 +1,199 @@
+import os
+import time
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+GENAI_MODEL = os.getenv("GENAI_MODEL", "gemini-2.0-flash")
+
+
+def _tiers(env_name: str, default: list) -> list:
+    raw = os.getenv(env_name, "")
+    tiers = [model.strip() for model in raw.split(",") if model.strip()]
+    return tiers or default
+
+
+# Cheapest model first, e.g. "gemini-2.0-flash-lite,gemini-2.0-flash".
+# A single model (the default) means no cascade.
+GENAI_MODEL_TIERS = _tiers("GENAI_MODEL_TIERS", [GENAI_MODEL])
+STAGE1_MODEL_TIERS = _tiers("STAGE1_MODEL_TIERS", GENAI_MODEL_TIERS)
+STAGE4_MODEL_TIERS = _tiers("STAGE4_MODEL_TIERS", GENAI_MODEL_TIERS)
+
+# Stage 4 results this close to a recommendation cutoff are escalated
+CASCADE_BOUNDARY_MARGIN = int(os.getenv("CASCADE_BOUNDARY_MARGIN", 3))
+RECOMMENDATION_CUTOFFS = (60, 75, 90)
+
+
+# ==========================================================
+# 🪜 MODEL CASCADE
+# ==========================================================
+class ModelCascade:
+    """
+    Runs a call on the cheapest model tier first and escalates to the next
+    tier only when the answer fails validation (schema problems, results
+    sitting on a decision boundary, errors).
+
+    Per tier it records calls, escalations and latency so the mix can be
+    tuned for throughput vs quality.
+    """
+
+    def __init__(self, name: str, tiers: list):
+        self.name = name
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._stats = {
+            tier: {"calls": 0, "escalations": 0, "errors": 0, "total_latency": 0.0, "reasons": {}}
+            for tier in tiers
+        }
+
+    @property
+    def key(self) -> str:
+        """
+        Identifies the tier mix (used in cache keys).
+        """
+        return "|".join(self.tiers)
+
+    async def run(self, call_tier, validate, first_tier: int = 0):
+        """
+        call_tier(model) -> awaitable result
+        validate(result) -> None if acceptable, else a short reason string
+        first_tier: skip cheaper tiers already tried elsewhere (batch jobs)
+
+        The last tier's answer is returned even if it fails validation
+        (validation problems are repaired by the callers' clamping);
+        only its exceptions propagate.
+        """
+        first_tier = min(first_tier, len(self.tiers) - 1)
+
+        for index, model in enumerate(self.tiers[first_tier:], start=first_tier):
+            is_last = index == len(self.tiers) - 1
+            started = time.monotonic()
+
+            try:
+                result = await call_tier(model)
+                reason = validate(result)
+            except Exception as e:
+                self._record(model, time.monotonic() - started, escalated=not is_last, reason="error", error=True)
+                if is_last:
+                    raise
+                print(f"   🪜 {self.name}: {model} failed ({e}), escalating")
+                continue
+
+            escalate = reason is not None and not is_last
+            self._record(model, time.monotonic() - started, escalated=escalate, reason=reason)
+
+            if not escalate:
+                return result
+
+            print(f"   🪜 {self.name}: {model} answer rejected ({reason}), escalating")
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for tier, s in self._stats.items():
+                out[tier] = {
+                    "calls": s["calls"],
+                    "escalations": s["escalations"],
+                    "errors": s["errors"],
+                    "escalation_rate": round(s["escalations"] / s["calls"], 3) if s["calls"] else None,
+                    "avg_latency_seconds": round(s["total_latency"] / s["calls"], 3) if s["calls"] else None,
+                    "escalation_reasons": dict(s["reasons"]),
+                }
+            return {"tiers": self.tiers, "per_tier": out}
+
+    def _record(self, model, latency, escalated, reason=None, error=False):
+        with self._lock:
+            s = self._stats[model]
+            s["calls"] += 1
+            s["total_latency"] += latency
+            if error:
+                s["errors"] += 1
+            if escalated:
+                s["escalations"] += 1
+                s["reasons"][reason] = s["reasons"].get(reason, 0) + 1
+
+
+# -----------------------------
+# Validators
+# -----------------------------
+def _valid_score(value) -> bool:
+    return isinstance(value, int) and 1 <= value <= 100
+
+
+def validate_stage1_part(part: str, data: dict):
+    """
+    Returns None if a (split or combined) Stage 1 answer is usable,
+    else the reason to escalate.
+    """
+    if not isinstance(data, dict):
+        return "not_an_object"
+
+    if part in ("score", "all"):
+        if not _valid_score(data.get("code_quality_score")):
+            return "invalid_score"
+        if len(str(data.get("code_description", "")).strip()) < 20:
+            return "short_description"
+
+    if part in ("interview_questions", "all"):
+        questions = data.get("interview_questions")
+        if not isinstance(questions, list) or len(questions) < 5:
+            return "too_few_questions"
+        if any(not isinstance(q, str) or len(q.strip()) < 15 for q in questions):
+            return "empty_question"
+
+    if part in ("mcq_questions", "all"):
+        mcqs = data.get("mcq_questions")
+        if not isinstance(mcqs, list) or len(mcqs) < 3:
+            return "too_few_mcqs"
+        for mcq in mcqs:
+            if not isinstance(mcq, dict) or len(mcq.get("options") or []) != 4:
+                return "bad_mcq_options"
+            if str(mcq.get("correct_answer", "")).strip().upper() not in ("A", "B", "C", "D"):
+                return "bad_mcq_answer"
+
+    return None
+
+
+def expected_recommendation(overall_score: int) -> str:
+    if overall_score >= 90:
+        return "Strong Hire"
+    if overall_score >= 75:
+        return "Hire"
+    if overall_score >= 60:
+        return "Maybe"
+    return "No Hire"
+
+
+def validate_stage4(data: dict):
+    """
+    Returns None if a Stage 4 answer is usable, else the reason to escalate.
+    Borderline scores (near 60/75/90) count as low confidence.
+    """
+    if not isinstance(data, dict):
+        return "not_an_object"
+
+    overall = data.get("overall_score")
+    if not _valid_score(overall) or not _valid_score(data.get("video_interview_score")):
+        return "invalid_score"
+
+    if data.get("recommendation") not in ("Strong Hire", "Hire", "Maybe", "No Hire"):
+        return "invalid_recommendation"
+
+    if data["recommendation"] != expected_recommendation(overall):
+        return "inconsistent_recommendation"
+
+    if any(abs(overall - cutoff) <= CASCADE_BOUNDARY_MARGIN for cutoff in RECOMMENDATION_CUTOFFS):
+        return "near_boundary"
+
+    if not data.get("strengths") or not data.get("weaknesses"):
+        return "missing_feedback"
+
+    return None
+
+
+stage1_cascade = ModelCascade("Stage 1", STAGE1_MODEL_TIERS)
+stage4_cascade = ModelCascade("Stage 4", STAGE4_MODEL_TIERS)
@@ -1,12 +1,15 @@
 import json
+import asyncio
 from typing import Dict, List
 from datetime import datetime
 from app.gemini_evaluator import (
     stage1_evaluate_code,
+    stage1_evaluate_code_stream,
     stage4_final_analysis
 )
-from app.qdrant_scorer import QdrantScorer
+from app.qdrant_scorer import QdrantScorer, index_candidate
 from app.mcq_scorer import MCQScorer
+from app.llm_metrics import set_metrics_context
 
 
 class CandidateEvaluationPipeline:
@@ -65,9 +68,13 @@ class CandidateEvaluationPipeline:
         self.repo_link = None
         self.interview_transcripts = None
         
+        # Compact Stage 1 artifacts reused by the slim Stage 4 prompt
+        self.resume_text = None
+        self.code_digest = None
+        
         self.created_at = datetime.utcnow().isoformat()
     
-    def run_stage1(self, repo_link: str, resume_bytes: bytes) -> Dict:
+    async def run_stage1(self, repo_link: str, resume_bytes: bytes) -> Dict:
         """
         STAGE 1: Complete initial evaluation
         
@@ -84,17 +91,21 @@ class CandidateEvaluationPipeline:
         print(f"[STAGE 1] Initial Evaluation for {self.candidate_id}")
         print(f"{'='*60}")
         
+        # Attribute every model/embedding call below to this candidate
+        set_metrics_context(jd_id=self.jd_id, candidate_id=self.candidate_id)
+        
         self.repo_link = repo_link
         self.resume_bytes = resume_bytes
         
         # 1. GEMINI: Evaluate code from GitHub
         print(f"\n🤖 [1/3] Gemini evaluating code from GitHub...")
-        self.stage1_result = stage1_evaluate_code(
+        self.stage1_result = await stage1_evaluate_code(
             repo_link=repo_link,
             task_description=self.task_description,
             jd_text=self.jd_text
         )
         
+        self.code_digest = self.stage1_result.get('code_digest')
         code_quality_score = self.stage1_result['code_quality_score']
         code_description = self.stage1_result['code_description']
         interview_questions = self.stage1_result['interview_questions']
@@ -104,23 +115,28 @@ class CandidateEvaluationPipeline:
         print(f"   ✅ Generated {len(interview_questions)} interview questions")
         print(f"   ✅ Generated {len(mcq_questions)} MCQ questions")
         
-        # 2. QDRANT: Calculate resume fit score
+        # 2 + 3. QDRANT: Resume fit and code fit scores
+        # Run together so their embeddings go out in one batched request
         print(f"\n📊 [2/3] Calculating resume fit score...")
-        self.resume_fit_score = self.qdrant_scorer.score_resume_fit(
-            resume_bytes=resume_bytes,
-            ideal_candidate_profile=self.ideal_candidate_profile,
-            candidate_id=self.candidate_id
-        )
-        print(f"   ✅ Resume Fit Score: {self.resume_fit_score}/100")
-        
-        # 3. QDRANT: Calculate code fit score
         print(f"\n📊 [3/3] Calculating code fit score...")
-        self.code_fit_score = self.qdrant_scorer.score_code_fit(
-            code_description=code_description,
-            task_description=self.task_description,
-            candidate_id=self.candidate_id
+        self.resume_text = await asyncio.to_thread(self.qdrant_scorer.extract_resume_text, resume_bytes)
+        self.resume_fit_score, self.code_fit_score = await asyncio.gather(
+            asyncio.to_thread(
+                self.qdrant_scorer.score_resume_fit,
+                resume_bytes=resume_bytes,
+                ideal_candidate_profile=self.ideal_candidate_profile,
+                candidate_id=self.candidate_id,
+                resume_text=self.resume_text
+            ),
+            asyncio.to_thread(
+                self.qdrant_scorer.score_code_fit,
+                code_description=code_description,
+                task_description=self.task_description,
+                candidate_id=self.candidate_id
+            )
         )
         
+        print(f"   ✅ Resume Fit Score: {self.resume_fit_score}/100")
         print(f"   ✅ Code Fit Score: {self.code_fit_score}/100")
         
         print(f"\n{'='*60}")
@@ -136,7 +152,146 @@ class CandidateEvaluationPipeline:
             "code_fit_score": self.code_fit_score
         }
     
-    def run_stage3(self, interview_videos: List[bytes], mcq_answers: List[str]) -> Dict:
+    async def run_stage1_stream(self, repo_link: str, resume_bytes: bytes, with_audio: bool = True):
+        """
+        STAGE 1 (streaming): same work as run_stage1, but yields
+        (event, data) tuples as soon as each artifact exists:
+
+        - code_quality       {code_quality_score, code_description}
+        - interview_question {index, question}      (one per question)
+        - mcq_questions      {mcq_questions}
+        - resume_fit         {resume_fit_score}
+        - code_fit           {code_fit_score}
+        - interview_audio    {index, question, audio_base64, mime_type}
+        - complete           same dict as run_stage1 + interview_audio
+        - error              {detail}
+
+        Resume fit starts immediately, code fit as soon as the code
+        description exists and TTS as soon as the questions exist.
+        """
+        from app.video_interview import generate_interview_audio
+
+        print(f"\n{'='*60}")
+        print(f"[STAGE 1] Streaming Evaluation for {self.candidate_id}")
+        print(f"{'='*60}")
+
+        # Attribute every model/embedding call below to this candidate
+        set_metrics_context(jd_id=self.jd_id, candidate_id=self.candidate_id)
+
+        self.repo_link = repo_link
+        self.resume_bytes = resume_bytes
+
+        queue = asyncio.Queue()
+        tasks = []
+        pending = 0
+        done_marker = object()
+        stage1 = {}
+        interview_audio = []
+
+        def spawn(coro):
+            nonlocal pending
+            pending += 1
+
+            async def runner():
+                try:
+                    await coro
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ Stage 1 stream error: {str(e)}")
+                    await queue.put(("error", {"detail": str(e)}))
+                finally:
+                    queue.put_nowait(done_marker)
+
+            tasks.append(asyncio.ensure_future(runner()))
+
+        async def resume_fit():
+            self.resume_text = await asyncio.to_thread(self.qdrant_scorer.extract_resume_text, resume_bytes)
+            self.resume_fit_score = await asyncio.to_thread(
+                self.qdrant_scorer.score_resume_fit,
+                resume_bytes=resume_bytes,
+                ideal_candidate_profile=self.ideal_candidate_profile,
+                candidate_id=self.candidate_id,
+                resume_text=self.resume_text
+            )
+            await queue.put(("resume_fit", {"resume_fit_score": self.resume_fit_score}))
+
+        async def code_fit(code_description):
+            self.code_fit_score = await asyncio.to_thread(
+                self.qdrant_scorer.score_code_fit,
+                code_description=code_description,
+                task_description=self.task_description,
+                candidate_id=self.candidate_id
+            )
+            await queue.put(("code_fit", {"code_fit_score": self.code_fit_score}))
+
+        async def audio(index, question):
+            audio_info = await asyncio.to_thread(generate_interview_audio, question)
+            interview_audio.append({"index": index, **audio_info})
+            await queue.put(("interview_audio", {"index": index, **audio_info}))
+
+        async def evaluate_code():
+            async for part, data in stage1_evaluate_code_stream(
+                repo_link=repo_link,
+                task_description=self.task_description,
+                jd_text=self.jd_text
+            ):
+                if part == "code_digest":
+                    # Internal artifact for Stage 4, not streamed to the client
+                    self.code_digest = data
+
+                elif part == "score":
+                    stage1.update(data)
+                    await queue.put(("code_quality", data))
+                    spawn(code_fit(data["code_description"]))
+
+                elif part == "interview_questions":
+                    stage1[part] = data
+                    for index, question in enumerate(data):
+                        await queue.put(("interview_question", {"index": index, "question": question}))
+                        if with_audio:
+                            spawn(audio(index, question))
+
+                else:
+                    stage1[part] = data
+                    await queue.put(("mcq_questions", {"mcq_questions": data}))
+
+        spawn(resume_fit())
+        spawn(evaluate_code())
+
+        try:
+            while pending:
+                item = await queue.get()
+                if item is done_marker:
+                    pending -= 1
+                    continue
+
+                yield item
+
+                if item[0] == "error":
+                    return
+        finally:
+            # Consumer went away (client disconnect) or a step failed
+            for task in tasks:
+                task.cancel()
+
+        self.stage1_result = stage1
+
+        print(f"\n{'='*60}")
+        print(f"✅ STAGE 1 COMPLETE (streamed)")
+        print(f"{'='*60}\n")
+
+        yield "complete", {
+            "code_quality_score": stage1["code_quality_score"],
+            "code_description": stage1["code_description"],
+            "interview_questions": stage1["interview_questions"],
+            "mcq_questions": stage1["mcq_questions"],
+            "resume_fit_score": self.resume_fit_score,
+            "code_fit_score": self.code_fit_score,
+            "interview_audio": sorted(interview_audio, key=lambda a: a["index"]),
+        }
+
+    async def run_stage3(self, interview_videos: List[bytes], mcq_answers: List[str]) -> Dict:
         """
         STAGE 3: Process responses and generate final evaluation
         
@@ -151,6 +306,9 @@ class CandidateEvaluationPipeline:
         print(f"[STAGE 3] Final Evaluation for {self.candidate_id}")
         print(f"{'='*60}")
         
+        # Attribute every model/embedding call below to this candidate
+        set_metrics_context(jd_id=self.jd_id, candidate_id=self.candidate_id)
+        
         if not self.stage1_result:
             raise ValueError("Stage 1 must be completed first")
         
@@ -161,7 +319,7 @@ class CandidateEvaluationPipeline:
         print(f"\n🎬 [1/3] Transcribing video interview responses...")
         from app.video_interview import transcribe_video_responses
         
-        self.interview_transcripts = transcribe_video_responses(
+        self.interview_transcripts = await transcribe_video_responses(
             interview_questions=interview_questions,
             video_responses=interview_videos
         )
@@ -184,7 +342,7 @@ class CandidateEvaluationPipeline:
         
         # 3. GEMINI: Final comprehensive analysis
         print(f"\n🎯 [3/3] Gemini generating final comprehensive analysis...")
-        self.stage4_result = stage4_final_analysis(
+        self.stage4_result = await stage4_final_analysis(
             jd_text=self.jd_text,
             resume_bytes=self.resume_bytes,
             repo_link=self.repo_link,
@@ -194,7 +352,10 @@ class CandidateEvaluationPipeline:
             code_quality_score=self.stage1_result['code_quality_score'],
             mcq_score=self.mcq_score,
             interview_questions=interview_questions,
-            interview_transcripts=self.interview_transcripts
+            interview_transcripts=self.interview_transcripts,
+            resume_text=self.resume_text,
+            code_description=self.stage1_result['code_description'],
+            code_digest=self.code_digest
         )
         
         self.video_interview_score = self.stage4_result['video_interview_score']
@@ -204,6 +365,9 @@ class CandidateEvaluationPipeline:
         print(f"   ✅ Overall Score: {overall_score}/100")
         print(f"   ✅ Recommendation: {self.stage4_result['recommendation']}")
         
+        # Make the finished evaluation searchable (/api/candidates/search)
+        await asyncio.to_thread(index_candidate, self.search_payload(), self.candidate_id)
+        
         print(f"\n{'='*60}")
         print(f"✅ STAGE 3 COMPLETE - EVALUATION FINISHED")
         print(f"{'='*60}\n")
@@ -224,6 +388,24 @@ class CandidateEvaluationPipeline:
             }
         }
     
+    def search_payload(self) -> Dict:
+        """Filterable fields stored with the candidate's search vector"""
+        return {
+            'candidate_id': self.candidate_id,
+            'jd_id': self.jd_id,
+            'recommendation': self.stage4_result['recommendation'],
+            'overall_score': self.stage4_result['overall_score'],
+            'code_quality_score': self.stage1_result['code_quality_score'],
+            'resume_fit_score': self.resume_fit_score,
+            'code_fit_score': self.code_fit_score,
+            'mcq_score': self.mcq_score,
+            'video_interview_score': self.video_interview_score,
+            'summary': self.stage4_result['summary'],
+            'strengths': self.stage4_result['strengths'],
+            'weaknesses': self.stage4_result['weaknesses'],
+            'evaluated_at': datetime.utcnow().isoformat()
+        }
+    
     def get_full_evaluation(self) -> Dict:
         """Get complete evaluation results for storage/reporting"""
         return {
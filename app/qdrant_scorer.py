@@ -1,80 +1,360 @@
 import os
+import json
+import time
 import uuid
+import base64
+import asyncio
+import threading
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from google import genai
-from google.genai import types
+from app.llm_backend import get_llm_backend
+from app.llm_metrics import llm_metrics
+from app.embedding_cache import embedding_cache
+from app.embedding_batcher import EmbeddingBatcher
+from app import similarity
+from app.vector_writer import VectorWriteBehind
+from app.local_index import get_local_index, SEARCH_RERANK_FACTOR
+from app.lexical import tokenize, get_idf_table, reciprocal_rank_fusion
 
 load_dotenv()
 
 # ------------------------------------------
 # GEMINI EMBEDDINGS (REPLACES SENTENCE-TRANSFORMERS)
 # ------------------------------------------
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-genai_client = genai.Client(api_key=GENAI_API_KEY)
-
-# Gemini embedding model - 768 dimensions
+# Gemini embedding model - 768 dimensions, kept in full (scores and
+# reranking); shorter renormalized prefixes are derived per collection
 EMBEDDING_MODEL = "models/text-embedding-004"
-VECTOR_DIM = 384
+VECTOR_DIM = int(os.getenv("EMBEDDING_DIM", 768))
 
 
-def get_embedding(text: str):
+def _embed_batch(texts: list) -> list:
     """
-    Get embedding from Gemini API
-    Replaces sentence-transformers
+    One embedding request for many texts (called by the batcher), through
+    the configured backend so LLM_BACKEND=fake never calls the real API
+    """
+    return [vector[:VECTOR_DIM] for vector in get_llm_backend().embed(EMBEDDING_MODEL, texts)]
+
+
+def _record_embedding(texts: list, wall_seconds: float, ok: bool):
+    """
+    Usage of one caller's share of a batched request, recorded in that
+    caller's metrics context (jd_id / candidate_id)
+    """
+    # The embedding response carries no usage data, estimate ~4 chars/token
+    llm_metrics.record(
+        stage="embedding",
+        model=EMBEDDING_MODEL,
+        input_tokens=sum(len(text) for text in texts) // 4 if ok else 0,
+        wall_seconds=wall_seconds,
+        ok=ok,
+        label=f"embedding x{len(texts)}",
+    )
+
+
+# Texts from concurrent callers are merged into one request per window
+embedding_batcher = EmbeddingBatcher(_embed_batch, _record_embedding)
+
+
+def get_embeddings(texts: list) -> list:
+    """
+    Embeddings for several texts: cached ones come from embedding_cache,
+    the rest go out together through embedding_batcher (one round trip,
+    shared with whatever else is embedding at the same moment)
     """
+    vectors = [None] * len(texts)
+    keys = [embedding_cache.make_key(EMBEDDING_MODEL, text, VECTOR_DIM) for text in texts]
+
+    missing = []
+    for i, key in enumerate(keys):
+        cached = embedding_cache.get(key)
+        if cached is not None:
+            llm_metrics.record_cache_hit("embedding", model=EMBEDDING_MODEL)
+            vectors[i] = cached
+        else:
+            missing.append(i)
+
+    if not missing:
+        return vectors
+
     try:
-        result = genai_client.models.embed_content(
-            model=EMBEDDING_MODEL,
-            contents=text
-        )
-        return result.embeddings[0].values[:384]
+        embedded = embedding_batcher.embed([texts[i] for i in missing])
     except Exception as e:
         print(f"   ⚠️ Embedding error: {str(e)}")
-        # Return zero vector as fallback
-        return [0.0] * VECTOR_DIM
+        # Zero vector fallback, never cached
+        for i in missing:
+            vectors[i] = [0.0] * VECTOR_DIM
+        return vectors
+
+    for i, vector in zip(missing, embedded):
+        embedding_cache.set(keys[i], vector)
+        vectors[i] = vector
+
+    return vectors
+
+
+def get_embedding(text: str):
+    """
+    Get embedding from Gemini API
+    Replaces sentence-transformers
+    Served from embedding_cache when the same text was embedded before
+    (profiles and task descriptions repeat for every applicant)
+    """
+    return get_embeddings([text])[0]
 
 
 def cosine_similarity(vec1, vec2):
     """Calculate cosine similarity between two vectors"""
-    import math
-    
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    magnitude1 = math.sqrt(sum(a * a for a in vec1))
-    magnitude2 = math.sqrt(sum(b * b for b in vec2))
-    
-    if magnitude1 == 0 or magnitude2 == 0:
-        return 0.0
-    
-    return dot_product / (magnitude1 * magnitude2)
+    return similarity.cosine(vec1, vec2)
 
 
 # ------------------------------------------
-# QDRANT SETUP
+# QDRANT SETUP (lazy)
 # ------------------------------------------
-qdrant_url = os.getenv("QDRANT_URL")
-qdrant_api_key = os.getenv("QDRANT_API_KEY")
+# Nothing connects at import time: the client is created on first use
+# and collections are bootstrapped by the app's startup hook
+QDRANT_URL = os.getenv("QDRANT_URL")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+
+COLLECTION = "candidates"
+CODE_FIT_COLLECTION = "code_fit"
+COLLECTIONS = (COLLECTION, CODE_FIT_COLLECTION)
+
+# Every point carries two named vectors: "coarse" (renormalized prefix,
+# candidate generation) and "full" (reranking). Coarse size per collection:
+COARSE_DIMS = {
+    COLLECTION: int(os.getenv("CANDIDATES_COARSE_DIM", 256)),
+    CODE_FIT_COLLECTION: int(os.getenv("CODE_FIT_COARSE_DIM", 128)),
+}
+COARSE_VECTOR = "coarse"
+FULL_VECTOR = "full"
+
+# Candidates also carry a sparse BM25 vector ("lexical", idf from the
+# local table in app.lexical) so exact tech terms are matched; ranked
+# search fuses dense and lexical results (reciprocal rank fusion)
+LEXICAL_VECTOR = "lexical"
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "1") == "1"
+
+# Drop and recreate collections still using the old single 384-d vector
+QDRANT_RECREATE_LEGACY = os.getenv("QDRANT_RECREATE_LEGACY", "0") == "1"
+
+# Vector quantization: "scalar" (int8, 4x smaller), "binary" (32x
+# smaller, best with high-dimensional vectors) or "none"
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none")
+QDRANT_SCALAR_QUANTILE = float(os.getenv("QDRANT_SCALAR_QUANTILE", 0.99))
+QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", 2.0))
+QDRANT_RESCORE = os.getenv("QDRANT_RESCORE", "1") == "1"
+
+# Score fields stored with every indexed candidate (filterable ranges)
+SCORE_FIELDS = (
+    "overall_score",
+    "code_quality_score",
+    "resume_fit_score",
+    "code_fit_score",
+    "mcq_score",
+    "video_interview_score",
+)
+
+# Filterable payload fields of the candidates collection -> index type
+PAYLOAD_INDEXES = {
+    "jd_id": "keyword",
+    "candidate_id": "keyword",
+    "recommendation": "keyword",
+    **{field: "integer" for field in SCORE_FIELDS},
+}
+
+# Without Qdrant, candidates are indexed/searched in an embedded local
+# index (app.local_index) instead of being dropped
+LOCAL_INDEX_ENABLED = os.getenv("LOCAL_INDEX_ENABLED", "1") == "1"
+
+_qdrant_client = None
+_qdrant_lock = threading.Lock()
+
+
+def get_qdrant_client():
+    """
+    Qdrant client, or None when Qdrant cloud is not configured
+    """
+    global _qdrant_client
+
+    if not (QDRANT_URL and QDRANT_API_KEY):
+        return None
+
+    if _qdrant_client is None:
+        with _qdrant_lock:
+            if _qdrant_client is None:
+                from qdrant_client import QdrantClient
+
+                _qdrant_client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+    return _qdrant_client
 
-if qdrant_url and qdrant_api_key:
-    qdrant_client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
-    COLLECTION = "candidates"
 
-    if not qdrant_client.collection_exists(COLLECTION):
-        qdrant_client.create_collection(
-            collection_name=COLLECTION,
-            vectors_config=VectorParams(size=VECTOR_DIM, distance=Distance.COSINE)
+def quantization_config(mode: str = QDRANT_QUANTIZATION):
+    """
+    Qdrant quantization config for QDRANT_QUANTIZATION (None = off).
+    Quantized vectors stay in RAM, the float originals go to disk.
+    """
+    from qdrant_client import models
+
+    if mode == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=QDRANT_SCALAR_QUANTILE,
+                always_ram=True,
+            )
         )
-    
-    # Create code_fit collection if it doesn't exist
-    if not qdrant_client.collection_exists("code_fit"):
-        qdrant_client.create_collection(
-            collection_name="code_fit",
-            vectors_config=VectorParams(size=VECTOR_DIM, distance=Distance.COSINE)
+    if mode == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+    if mode in ("none", ""):
+        return None
+
+    raise ValueError(f"Unknown QDRANT_QUANTIZATION: {mode}")
+
+
+def search_params():
+    """
+    Query-time params: over-fetch QDRANT_OVERSAMPLING x limit with the
+    quantized vectors, then rescore them with the originals
+    """
+    from qdrant_client import models
+
+    if quantization_config() is None:
+        return None
+
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            rescore=QDRANT_RESCORE,
+            oversampling=QDRANT_OVERSAMPLING,
+        )
+    )
+
+
+def named_vectors(collection: str, vector) -> dict:
+    """
+    Full vector -> {"coarse": renormalized prefix, "full": vector}
+    """
+    coarse = similarity.normalize(vector[:COARSE_DIMS[collection]])
+    return {COARSE_VECTOR: coarse.tolist(), FULL_VECTOR: list(vector)}
+
+
+def sparse_vector(weights: dict):
+    from qdrant_client.models import SparseVector
+
+    return SparseVector(indices=list(weights), values=list(weights.values()))
+
+
+def lexical_text(final_analysis: dict) -> str:
+    strengths = final_analysis.get("strengths") or []
+    if isinstance(strengths, list):
+        strengths = " ".join(str(item) for item in strengths)
+    return f"{final_analysis.get('summary', '')} {strengths}"
+
+
+def ensure_collection(name: str):
+    from qdrant_client.models import Distance, VectorParams, SparseVectorParams
+
+    client = get_qdrant_client()
+    quantization = quantization_config()
+    lexical = name == COLLECTION
+
+    if client.collection_exists(name):
+        params = client.get_collection(name).config.params
+        vectors = params.vectors
+        legacy = not isinstance(vectors, dict) or set(vectors) != {COARSE_VECTOR, FULL_VECTOR}
+        if lexical and LEXICAL_VECTOR not in (params.sparse_vectors or {}):
+            legacy = True
+        if legacy:
+            if not QDRANT_RECREATE_LEGACY:
+                print(f"⚠️ Qdrant collection '{name}' uses an old vector layout, "
+                      f"set QDRANT_RECREATE_LEGACY=1 to recreate it")
+                return
+            client.delete_collection(name)
+            print(f"   🗑️ Dropped legacy collection '{name}'")
+
+    if not client.collection_exists(name):
+        client.create_collection(
+            collection_name=name,
+            vectors_config={
+                # Searched for every query: RAM (quantized if configured)
+                COARSE_VECTOR: VectorParams(
+                    size=COARSE_DIMS[name],
+                    distance=Distance.COSINE,
+                    on_disk=quantization is not None
+                ),
+                # Only read for the reranked top-N: disk
+                FULL_VECTOR: VectorParams(
+                    size=VECTOR_DIM,
+                    distance=Distance.COSINE,
+                    on_disk=True
+                ),
+            },
+            sparse_vectors_config={LEXICAL_VECTOR: SparseVectorParams()} if lexical else None,
+            quantization_config=quantization
         )
-else:
-    print("⚠️ Qdrant cloud not configured - running without persistent storage")
-    qdrant_client = None
+        print(f"   ✅ Created Qdrant collection '{name}' "
+              f"({COARSE_DIMS[name]}/{VECTOR_DIM} dims, quantization: {QDRANT_QUANTIZATION})")
+
+    elif quantization is not None and client.get_collection(name).config.quantization_config is None:
+        # Existing unquantized collection: Qdrant quantizes it in place
+        client.update_collection(collection_name=name, quantization_config=quantization)
+        print(f"   ✅ Enabled {QDRANT_QUANTIZATION} quantization on '{name}'")
+
+    if name == COLLECTION:
+        ensure_payload_indexes(name)
+
+
+def ensure_payload_indexes(name: str):
+    """
+    Payload indexes for the fields candidate search filters on, so
+    filtered search does not scan every payload
+    """
+    from qdrant_client.models import PayloadSchemaType
+
+    client = get_qdrant_client()
+    existing = client.get_collection(name).payload_schema or {}
+
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field not in existing:
+            client.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=PayloadSchemaType(schema),
+            )
+            print(f"   ✅ Payload index '{field}' ({schema}) on '{name}'")
+
+
+async def bootstrap_qdrant():
+    """
+    Connects and creates missing collections, all collections at once
+    (called from the FastAPI startup hook)
+    """
+    if get_qdrant_client() is None:
+        if LOCAL_INDEX_ENABLED:
+            print("⚠️ Qdrant cloud not configured - using the local vector index")
+        else:
+            print("⚠️ Qdrant cloud not configured - running without persistent storage")
+        return
+
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(asyncio.to_thread(ensure_collection, name) for name in COLLECTIONS))
+    except Exception as e:
+        # Not fatal: scoring works without the collections
+        print(f"⚠️ Qdrant bootstrap failed: {str(e)}")
+        return
+
+    print(f"✅ Qdrant ready ({len(COLLECTIONS)} collections, {time.monotonic() - started:.2f}s)")
+
+
+# Code vectors are written in the background, in batches
+vector_writer = VectorWriteBehind(get_qdrant_client)
+
+
+def candidate_point_id(collection: str, candidate_id: str) -> str:
+    """
+    Deterministic point id, so re-scoring a candidate overwrites their
+    point instead of growing the collection
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{collection}/{candidate_id}"))
 
 
 # ------------------------------------------
@@ -112,23 +392,48 @@ def extract_resume_text_from_pdf(resume_bytes: bytes) -> str:
 
 
 # ------------------------------------------
-# INDEX CANDIDATE IN QDRANT
+# INDEX CANDIDATE IN QDRANT (or the local index)
 # ------------------------------------------
 def index_candidate(final_analysis: dict, candidate_id: str = None):
-    if not qdrant_client:
+    """
+    Stores a finished evaluation for search. final_analysis is the
+    payload (candidate_id, jd_id, recommendation, scores, summary, ...);
+    its summary is embedded, summary and strengths feed the lexical
+    vector. One point per (jd_id, candidate_id).
+    """
+    qdrant_client = get_qdrant_client()
+    if not qdrant_client and not LOCAL_INDEX_ENABLED:
         return candidate_id or str(uuid.uuid4())
 
-    candidate_id = candidate_id or str(uuid.uuid4())
+    candidate_id = candidate_id or final_analysis.get("candidate_id") or str(uuid.uuid4())
+    payload = {**final_analysis, "candidate_id": candidate_id}
+    point_id = candidate_point_id(COLLECTION, f"{payload.get('jd_id')}/{candidate_id}")
 
     try:
         summary = final_analysis.get("summary", "")
         embedding = get_embedding(summary)
 
-        qdrant_client.upsert(
-            collection_name=COLLECTION,
-            points=[PointStruct(id=candidate_id, vector=embedding, payload=final_analysis)],
-            wait=True
-        )
+        terms = tokenize(lexical_text(final_analysis))
+        idf_table = get_idf_table(COLLECTION)
+        idf_table.add(point_id, terms)
+        lexical = idf_table.document_vector(terms)
+
+        if qdrant_client:
+            from qdrant_client.models import PointStruct
+
+            vectors = named_vectors(COLLECTION, embedding)
+            if lexical:
+                vectors[LEXICAL_VECTOR] = sparse_vector(lexical)
+
+            qdrant_client.upsert(
+                collection_name=COLLECTION,
+                points=[PointStruct(id=point_id, vector=vectors, payload=payload)],
+                wait=True
+            )
+        else:
+            get_local_index(COLLECTION, VECTOR_DIM, COARSE_DIMS[COLLECTION]).upsert(
+                point_id, embedding, payload, sparse=lexical
+            )
 
         print(f"   ✅ Indexed candidate {candidate_id}")
         return candidate_id
@@ -141,19 +446,193 @@ def index_candidate(final_analysis: dict, candidate_id: str = None):
 # ------------------------------------------
 # SEARCH CANDIDATES
 # ------------------------------------------
-def search_candidates(jd_text: str, limit: int = 5):
-    if not qdrant_client:
-        return []
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
 
+def decode_cursor(cursor: str) -> dict:
     try:
-        query_vector = get_embedding(jd_text)
-        results = qdrant_client.search(
-            collection_name=COLLECTION,
-            query_vector=query_vector,
-            limit=limit,
-            with_payload=True
-        )
-        return [hit.payload for hit in results]
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _payload_matches(payload, jd_id=None, recommendations=None, score_ranges=None) -> bool:
+    if jd_id is not None and payload.get("jd_id") != jd_id:
+        return False
+    if recommendations and payload.get("recommendation") not in recommendations:
+        return False
+    for field, (low, high) in (score_ranges or {}).items():
+        value = payload.get(field)
+        if value is None or (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+def _qdrant_filter(jd_id=None, recommendations=None, score_ranges=None):
+    from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny, Range
+
+    must = []
+    if jd_id is not None:
+        must.append(FieldCondition(key="jd_id", match=MatchValue(value=jd_id)))
+    if recommendations:
+        must.append(FieldCondition(key="recommendation", match=MatchAny(any=list(recommendations))))
+    for field, (low, high) in (score_ranges or {}).items():
+        must.append(FieldCondition(key=field, range=Range(gte=low, lte=high)))
+
+    return Filter(must=must) if must else None
+
+
+def find_candidates(
+    query_text: str = None,
+    jd_id: str = None,
+    recommendations: list = None,
+    score_ranges: dict = None,
+    score_threshold: float = None,
+    limit: int = 20,
+    cursor: str = None,
+) -> dict:
+    """
+    Filtered candidate search, one page at a time.
+
+    query_text: rank by similarity to this text (e.g. a JD); without it
+        matching candidates are listed in index order
+    score_ranges: {"overall_score": (min, max), ...}, None = open end
+    score_threshold: minimum cosine similarity of dense matches (query_text only)
+    cursor: next_cursor of the previous page
+
+    Ranked results fuse dense and lexical matches (hybrid search); their
+    similarity is then the fused (RRF) score, not a cosine.
+
+    Returns {"results": [{"candidate_id", "jd_id", "similarity", "payload"}],
+             "next_cursor": str or None}
+    """
+    state = decode_cursor(cursor) if cursor else {}
+    filters = {"jd_id": jd_id, "recommendations": recommendations, "score_ranges": score_ranges}
+    query_vector = get_embedding(query_text) if query_text else None
+    query_lexical = {}
+    if query_text and HYBRID_SEARCH_ENABLED:
+        query_lexical = get_idf_table(COLLECTION).query_vector(tokenize(query_text))
+    qdrant_client = get_qdrant_client()
+
+    if qdrant_client:
+        if query_vector is not None:
+            from qdrant_client.models import Prefetch, FusionQuery, Fusion
+
+            # Ranked pages: offset pagination. Coarse vectors (filtered)
+            # generate the candidates, full vectors rerank them.
+            offset = state.get("offset", 0)
+            fetch = offset + limit
+            dense = Prefetch(
+                query=named_vectors(COLLECTION, query_vector)[COARSE_VECTOR],
+                using=COARSE_VECTOR,
+                filter=_qdrant_filter(**filters),
+                params=search_params(),
+                limit=fetch * SEARCH_RERANK_FACTOR,
+            )
+
+            if query_lexical:
+                # Hybrid: reranked dense and lexical lists, fused by rank
+                ranking = {
+                    "prefetch": [
+                        Prefetch(
+                            prefetch=dense,
+                            query=list(query_vector),
+                            using=FULL_VECTOR,
+                            score_threshold=score_threshold,
+                            limit=fetch,
+                        ),
+                        Prefetch(
+                            query=sparse_vector(query_lexical),
+                            using=LEXICAL_VECTOR,
+                            filter=_qdrant_filter(**filters),
+                            limit=fetch,
+                        ),
+                    ],
+                    "query": FusionQuery(fusion=Fusion.RRF),
+                }
+            else:
+                ranking = {
+                    "prefetch": dense,
+                    "query": list(query_vector),
+                    "using": FULL_VECTOR,
+                    "score_threshold": score_threshold,
+                }
+
+            hits = qdrant_client.query_points(
+                collection_name=COLLECTION,
+                **ranking,
+                limit=limit,
+                offset=offset,
+                with_payload=True,
+            ).points
+            rows = [(hit.score, hit.payload) for hit in hits]
+            next_state = {"offset": offset + limit} if len(hits) == limit else None
+        else:
+            # Unranked listing: Qdrant's own scroll cursor
+            points, next_offset = qdrant_client.scroll(
+                collection_name=COLLECTION,
+                scroll_filter=_qdrant_filter(**filters),
+                limit=limit,
+                offset=state.get("point"),
+                with_payload=True,
+            )
+            rows = [(None, point.payload) for point in points]
+            next_state = {"point": next_offset} if next_offset is not None else None
+
+    elif LOCAL_INDEX_ENABLED:
+        index = get_local_index(COLLECTION, VECTOR_DIM, COARSE_DIMS[COLLECTION])
+
+        if query_vector is not None:
+            offset = state.get("offset", 0)
+            where = lambda payload: _payload_matches(payload, **filters)
+            hits = index.search(
+                query_vector,
+                limit=offset + limit,
+                where=where,
+                score_threshold=score_threshold,
+                rerank_factor=SEARCH_RERANK_FACTOR,
+            )
+
+            if query_lexical:
+                lexical_hits = index.search_sparse(query_lexical, limit=offset + limit, where=where)
+                fused = reciprocal_rank_fusion([hits, lexical_hits], key=lambda hit: hit["id"], limit=offset + limit)
+                hits = [{**hit, "score": score} for score, hit in fused]
+
+            hits = hits[offset:]
+            rows = [(hit["score"], hit["payload"]) for hit in hits]
+            next_state = {"offset": offset + limit} if len(hits) == limit else None
+        else:
+            row = state.get("row", 0)
+            rows = []
+            while row < len(index) and len(rows) < limit:
+                payload = index.payloads[row]
+                if _payload_matches(payload, **filters):
+                    rows.append((None, payload))
+                row += 1
+            next_state = {"row": row} if row < len(index) else None
+
+    else:
+        rows, next_state = [], None
+
+    return {
+        "results": [
+            {
+                "candidate_id": payload.get("candidate_id"),
+                "jd_id": payload.get("jd_id"),
+                "similarity": round(score, 4) if score is not None else None,
+                "payload": payload,
+            }
+            for score, payload in rows
+        ],
+        "next_cursor": encode_cursor(next_state) if next_state else None,
+    }
+
+
+def search_candidates(jd_text: str, limit: int = 5):
+    try:
+        page = find_candidates(query_text=jd_text, limit=limit)
+        return [hit["payload"] for hit in page["results"]]
     except Exception as e:
         print(f"   ⚠️ Search failed: {str(e)}")
         return []
@@ -169,13 +648,14 @@ class QdrantScorer:
     - No heavy ML packages required
     """
 
-    def __init__(self):
-        self.client = qdrant_client
+    @property
+    def client(self):
+        return get_qdrant_client()
 
     # ------------------------------------------------------
     # Resume extraction (simple PDF parsing)
     # ------------------------------------------------------
-    def _extract_resume_text(self, resume_bytes):
+    def extract_resume_text(self, resume_bytes):
         try:
             import io
             from PyPDF2 import PdfReader
@@ -203,11 +683,9 @@ class QdrantScorer:
         Returns score from 1-100
         """
         try:
-            vec1 = get_embedding(text1)
-            vec2 = get_embedding(text2)
-            sim = cosine_similarity(vec1, vec2)  # -1 to 1
-            score = int(((sim + 1) / 2) * 100)  # Convert to 1-100
-            return max(1, min(100, score))
+            vec1, vec2 = get_embeddings([text1, text2])
+            sim = similarity.cosine(vec1, vec2)  # -1 to 1
+            return similarity.similarity_to_score(sim)  # Convert to 1-100
         except Exception as e:
             print(f"   ⚠️ Similarity calculation error: {str(e)}")
             return 50
@@ -245,14 +723,16 @@ class QdrantScorer:
     # ------------------------------------------------------
     # FINAL RESUME FIT SCORE (balanced)
     # ------------------------------------------------------
-    def score_resume_fit(self, resume_bytes, ideal_candidate_profile, candidate_id=None):
+    def score_resume_fit(self, resume_bytes, ideal_candidate_profile, candidate_id=None, resume_text=None):
         """
         Score resume against job description
+        Pass resume_text when it was already extracted to skip PDF parsing
         Returns: 1-100 score
         """
         print(f"   📊 Scoring resume fit...")
         
-        resume_text = self._extract_resume_text(resume_bytes)
+        if resume_text is None:
+            resume_text = self.extract_resume_text(resume_bytes)
         if not resume_text:
             print("   ❌ No text extracted → default 35")
             return 35
@@ -277,51 +757,37 @@ class QdrantScorer:
     def score_code_fit(self, code_description, task_description, candidate_id):
         """
         Score how well submitted code matches the task
+        Computed directly from the two vectors; the code vector is stored
+        in the background (write-behind), scoring never waits for Qdrant
         Returns: 1-100 score
         """
-        if not self.client:
-            print("   ⚠️ Qdrant not configured, using direct similarity")
-            return self._semantic_similarity_score(code_description, task_description)
-        
         try:
-            # Embed code and task using Gemini
-            code_embedding = get_embedding(code_description)
-            task_embedding = get_embedding(task_description)
-
-            # Store code vector
-            point_id = int(uuid.uuid4().int % (2**63))
-            self.client.upsert(
-                collection_name="code_fit",
-                points=[
+            # Embed code and task using Gemini (one request)
+            code_embedding, task_embedding = get_embeddings([code_description, task_description])
+
+            sim = similarity.cosine(code_embedding, task_embedding)
+            score = similarity.similarity_to_score(sim)
+
+            # Store code vector, one point per candidate (re-evaluations overwrite)
+            if self.client:
+                from qdrant_client.models import PointStruct
+
+                vector_writer.enqueue(
+                    CODE_FIT_COLLECTION,
                     PointStruct(
-                        id=point_id,
-                        vector=code_embedding,
+                        id=candidate_point_id(CODE_FIT_COLLECTION, candidate_id),
+                        vector=named_vectors(CODE_FIT_COLLECTION, code_embedding),
                         payload={
                             "candidate_id": candidate_id,
                             "type": "code",
                             "text": code_description[:500],
                         },
-                    )
-                ],
-            )
-
-            # Search against task
-            results = self.client.search(
-                collection_name="code_fit", 
-                query_vector=task_embedding, 
-                limit=1
-            )
+                    ),
+                )
 
-            # Convert similarity score to 1-100
-            if results:
-                similarity = results[0].score
-                score = max(1, min(100, int((similarity + 1) / 2 * 100)))
-            else:
-                score = 50
-
-            print(f"   🎯 Code Fit: {score}/100 (similarity: {similarity if results else 'N/A'})")
+            print(f"   🎯 Code Fit: {score}/100 (similarity: {sim:.3f})")
             return score
 
         except Exception as e:
             print(f"   ⚠️ Code fit scoring error: {str(e)}")
-            return 50
\ No newline at end of file
+            return 50
@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import threading
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+REPO_CACHE_DIR = os.getenv("REPO_CACHE_DIR", ".cache/repos")
+
+# Total size of cached file maps on disk before LRU eviction kicks in
+REPO_CACHE_MAX_BYTES = int(os.getenv("REPO_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+
+REPO_CACHE_ENABLED = os.getenv("REPO_CACHE_ENABLED", "1") != "0"
+
+
+# ==========================================================
+# 📦 COMMIT-SHA-KEYED REPOSITORY CACHE
+# ==========================================================
+class RepoCache:
+    """
+    On-disk cache of fetched repositories.
+
+    - File maps are stored per commit SHA, so a hit is always exact
+    - Branch -> SHA resolutions are stored with their ETag so the next
+      resolution can be a conditional (304) request
+    - Least recently used entries are evicted past max_bytes
+    """
+
+    def __init__(self, cache_dir: str = REPO_CACHE_DIR, max_bytes: int = REPO_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.refs_path = os.path.join(cache_dir, "refs.json")
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------
+    @staticmethod
+    def make_key(owner: str, repo: str, sha: str, path: str = "") -> str:
+        raw = f"{owner}/{repo}@{sha}:{path}".lower()
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    # ------------------------------------------------------
+    # File maps
+    # ------------------------------------------------------
+    def get(self, key: str):
+        """
+        Returns the cached {path: content} dict, or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                files = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # mtime doubles as the LRU timestamp
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return files
+
+    def put(self, key: str, files: dict):
+        self._atomic_write(self._entry_path(key), files)
+        self._evict()
+
+    # ------------------------------------------------------
+    # Branch -> SHA resolutions (with ETags)
+    # ------------------------------------------------------
+    def get_ref(self, ref_key: str):
+        """
+        Returns {"sha": ..., "etag": ...} or None.
+        """
+        with self._lock:
+            return self._load_refs().get(ref_key)
+
+    def put_ref(self, ref_key: str, sha: str, etag: str):
+        with self._lock:
+            refs = self._load_refs()
+            refs[ref_key] = {"sha": sha, "etag": etag}
+            self._atomic_write(self.refs_path, refs)
+
+    def _load_refs(self) -> dict:
+        try:
+            with open(self.refs_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # ------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------
+    def _atomic_write(self, path: str, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _evict(self):
+        """
+        Drops least recently used entries until the cache fits max_bytes.
+        """
+        entries = []
+        total = 0
+
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json") or name == "refs.json":
+                continue
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, entry_path in sorted(entries):
+            try:
+                os.remove(entry_path)
+                total -= size
+                print(f"   🧹 Evicted cached repo {os.path.basename(entry_path)}")
+            except OSError:
+                continue
+            if total <= self.max_bytes:
+                break
+
+
+repo_cache = RepoCache() if REPO_CACHE_ENABLED else None
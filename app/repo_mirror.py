@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import base64
+import threading
+import subprocess
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+# Unset = mirror mode disabled
+GITHUB_MIRROR_DIR = os.getenv("GITHUB_MIRROR_DIR")
+
+# Never touch the network, only read what is already mirrored (benchmarks)
+GITHUB_MIRROR_OFFLINE = os.getenv("GITHUB_MIRROR_OFFLINE", "0") == "1"
+
+# Minimum seconds between two incremental fetches of the same repo
+GITHUB_MIRROR_FETCH_INTERVAL = float(os.getenv("GITHUB_MIRROR_FETCH_INTERVAL", 60))
+
+GITHUB_CLONE_URL = os.getenv("GITHUB_CLONE_URL", "https://github.com").rstrip("/")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+GIT_TIMEOUT = float(os.getenv("GIT_TIMEOUT", 300))
+
+# GitHub owner / repo names; anything else never reaches a path or URL
+REPO_NAME_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+_locks = {}
+_locks_guard = threading.Lock()
+_last_fetch = {}
+
+
+# -----------------------------
+# git helpers
+# -----------------------------
+def _git(args, cwd=None, input_bytes=None) -> bytes:
+    env = None
+
+    if GITHUB_TOKEN:
+        # Passed per command through the environment (git >= 2.31): never
+        # in the mirror's config, and not on the command line where any
+        # local user could read it from ps / /proc/*/cmdline
+        basic = base64.b64encode(f"x-access-token:{GITHUB_TOKEN}".encode()).decode()
+        env = {
+            **os.environ,
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.extraHeader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {basic}",
+        }
+
+    result = subprocess.run(
+        ["git"] + args,
+        cwd=cwd,
+        env=env,
+        input=input_bytes,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=GIT_TIMEOUT,
+    )
+
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"git {args[0]} failed: {stderr}")
+
+    return result.stdout
+
+
+def _repo_lock(key: str) -> threading.Lock:
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+# -----------------------------
+# Mirror maintenance
+# -----------------------------
+def mirror_path(owner: str, repo: str) -> str:
+    for name in (owner, repo):
+        if not REPO_NAME_PATTERN.fullmatch(name or "") or name in (".", ".."):
+            raise ValueError(f"Invalid GitHub owner or repo name: {name!r}")
+    return os.path.join(GITHUB_MIRROR_DIR, owner.lower(), f"{repo.lower()}.git")
+
+
+def ensure_mirror(owner: str, repo: str) -> str:
+    """
+    Clones the repo as a bare mirror the first time, afterwards only runs
+    an incremental `git fetch`. Returns the mirror directory.
+    """
+    path = mirror_path(owner, repo)
+    key = f"{owner}/{repo}".lower()
+
+    with _repo_lock(key):
+        if not os.path.isdir(path):
+            if GITHUB_MIRROR_OFFLINE:
+                raise RuntimeError(f"Repo {key} is not mirrored and offline mode is on")
+
+            print(f"   🪞 Cloning mirror for {key}...")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _git(["clone", "--mirror", "--quiet", f"{GITHUB_CLONE_URL}/{owner}/{repo}.git", path])
+            _last_fetch[key] = time.time()
+
+        elif not GITHUB_MIRROR_OFFLINE and time.time() - _last_fetch.get(key, 0) > GITHUB_MIRROR_FETCH_INTERVAL:
+            print(f"   🔄 Incremental fetch for {key}...")
+            _git(["fetch", "--prune", "--quiet", "origin"], cwd=path)
+            _last_fetch[key] = time.time()
+
+    return path
+
+
+# -----------------------------
+# Read files from the object store
+# -----------------------------
+def read_mirror_blobs(owner: str, repo: str, ref: str, path: str = "", max_file_bytes: int = None) -> dict:
+    """
+    Reads every blob of ref (optionally under path) straight from the
+    mirror's object store: one ls-tree + one cat-file --batch, no per-file
+    HTTP. Returns {path: bytes}.
+    """
+    mirror = ensure_mirror(owner, repo)
+
+    try:
+        sha = _git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"], cwd=mirror).decode().strip()
+    except RuntimeError:
+        # Repo URL without /tree/<branch> defaults to "main"; fall back to HEAD
+        sha = _git(["rev-parse", "--verify", "HEAD^{commit}"], cwd=mirror).decode().strip()
+
+    ls_args = ["ls-tree", "-r", "-l", "-z", sha]
+    if path:
+        ls_args += ["--", path.strip("/")]
+    listing = _git(ls_args, cwd=mirror)
+
+    # "<mode> <type> <object> <size>\t<path>\0"
+    wanted = []
+    for entry in listing.split(b"\0"):
+        if not entry:
+            continue
+        meta, file_path = entry.split(b"\t", 1)
+        _, obj_type, obj_id, size = meta.split()
+        if obj_type != b"blob":
+            continue
+        if max_file_bytes and int(size) > max_file_bytes:
+            continue
+        wanted.append((obj_id.decode(), file_path.decode("utf-8", "replace")))
+
+    if not wanted:
+        return {}
+
+    batch_input = "".join(f"{obj_id}\n" for obj_id, _ in wanted).encode()
+    output = _git(["cat-file", "--batch"], cwd=mirror, input_bytes=batch_input)
+
+    # "<object> <type> <size>\n<content>\n" per requested object, in order
+    blobs = {}
+    offset = 0
+    for _, file_path in wanted:
+        header_end = output.index(b"\n", offset)
+        size = int(output[offset:header_end].split()[2])
+        start = header_end + 1
+        blobs[file_path] = output[start:start + size]
+        offset = start + size + 1
+
+    return blobs
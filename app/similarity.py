@@ -0,0 +1,54 @@
+import numpy as np
+
+# ==========================================================
+# 📐 VECTORIZED COSINE SIMILARITY
+# ==========================================================
+# Vectors are stored as contiguous float32 rows, L2-normalized once, so
+# cosine similarity is a plain dot product / matrix product.
+
+
+def normalize(vectors) -> np.ndarray:
+    """
+    One vector (1-D) or many (2-D, one per row) -> float32, unit length.
+    All-zero vectors (embedding fallbacks) stay zero.
+    """
+    array = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(array, axis=-1, keepdims=True)
+    np.maximum(norms, np.finfo(np.float32).tiny, out=norms)
+    return array / norms
+
+
+def cosine(vec1, vec2) -> float:
+    """
+    Cosine similarity of two vectors
+    """
+    return float(np.dot(normalize(vec1), normalize(vec2)))
+
+
+def top_k(scores, k: int):
+    """
+    Indices and values of the k largest scores, best first.
+    argpartition keeps this O(n) for large n.
+    """
+    scores = np.asarray(scores)
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+
+    if k < scores.shape[-1]:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(scores.shape[-1])
+
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order, scores[order]
+
+
+def similarity_to_score(similarity):
+    """
+    Cosine (-1..1) -> 1-100 score, same mapping the scorers always used.
+    Works on floats and arrays.
+    """
+    scores = np.clip(((np.asarray(similarity) + 1) / 2 * 100).astype(np.int64), 1, 100)
+    return int(scores) if scores.ndim == 0 else scores
+
@@ -0,0 +1,133 @@
+import os
+import time
+import queue
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -----------------------------
+# Config
+# -----------------------------
+VECTOR_WRITE_BATCH_SIZE = int(os.getenv("VECTOR_WRITE_BATCH_SIZE", 64))
+
+# A partial batch is written after at most this many seconds
+VECTOR_WRITE_FLUSH_INTERVAL = float(os.getenv("VECTOR_WRITE_FLUSH_INTERVAL", 2.0))
+VECTOR_WRITE_MAX_RETRIES = int(os.getenv("VECTOR_WRITE_MAX_RETRIES", 2))
+
+
+# ==========================================================
+# ✍️ WRITE-BEHIND VECTOR UPSERTS
+# ==========================================================
+class VectorWriteBehind:
+    """
+    Scoring never waits for Qdrant writes: points are queued here and a
+    background thread bulk-upserts them per collection, every
+    batch_size points or flush_interval seconds, whichever comes first.
+
+    get_client: function returning the Qdrant client (or None, in which
+    case queued points are dropped).
+    """
+
+    def __init__(
+        self,
+        get_client,
+        batch_size: int = VECTOR_WRITE_BATCH_SIZE,
+        flush_interval: float = VECTOR_WRITE_FLUSH_INTERVAL,
+        max_retries: int = VECTOR_WRITE_MAX_RETRIES,
+    ):
+        self.get_client = get_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._in_flight = 0
+
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def enqueue(self, collection: str, point):
+        self._ensure_thread()
+        with self._idle:
+            self._in_flight += 1
+        self._queue.put((collection, point))
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Blocks until everything queued so far is written (shutdown, tests).
+        """
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._in_flight,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="vector-write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            finally:
+                with self._idle:
+                    self._in_flight -= len(batch)
+                    self._idle.notify_all()
+
+    def _write(self, batch: list):
+        by_collection = {}
+        for collection, point in batch:
+            # Same point twice in one batch: the later one wins
+            by_collection.setdefault(collection, {})[point.id] = point
+
+        client = self.get_client()
+        if client is None:
+            self.failed += len(batch)
+            return
+
+        for collection, points in by_collection.items():
+            points = list(points.values())
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    client.upsert(collection_name=collection, points=points, wait=False)
+                    self.written += len(points)
+                    self.batches += 1
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.failed += len(points)
+                        print(f"   ⚠️ Dropped {len(points)} points for '{collection}': {str(e)}")
+                    else:
+                        time.sleep(0.5 * (2 ** attempt))
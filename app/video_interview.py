@@ -1,23 +1,30 @@
 import os
 import base64
+import asyncio
 from typing import List, Dict
 from dotenv import load_dotenv
+from google.genai import types
 
-# Free-tier compatible Gemini import
-import google.generativeai as genai
+from app.llm_client import llm_client
+from app.llm_backend import get_llm_backend
 
 load_dotenv()
 
-# Load API key
-GEMINI_API_KEY = os.getenv("GENAI_API_KEY")
-
-# Configure Gemini client
-genai.configure(api_key=GEMINI_API_KEY)
-
 # FREE TIER MODEL (supports text + PDF, NOT video)
+# Calls go through get_llm_backend(), same SDK/client as the evaluator
 GEMINI_MODEL = "gemini-2.0-flash"
 
-model = genai.GenerativeModel(GEMINI_MODEL)
+RESPONSE_ANALYSIS_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "technical_accuracy": types.Schema(type=types.Type.INTEGER),
+        "clarity": types.Schema(type=types.Type.INTEGER),
+        "depth": types.Schema(type=types.Type.INTEGER),
+        "communication": types.Schema(type=types.Type.INTEGER),
+        "feedback": types.Schema(type=types.Type.STRING),
+    },
+    required=["technical_accuracy", "clarity", "depth", "communication", "feedback"],
+)
 
 # --------------------------------------------------
 # TEXT-TO-SPEECH (OPTIONAL)
@@ -68,12 +75,13 @@ def generate_interview_audio(question: str) -> Dict:
 # --------------------------------------------------
 # REAL VIDEO TRANSCRIPTION USING GEMINI 1.5 FLASH
 # --------------------------------------------------
-def transcribe_video_responses(
+async def transcribe_video_responses(
     interview_questions: List[str], video_responses: List[bytes]
 ) -> List[Dict]:
     """
     REAL TRANSCRIPTION:
     Gemini 1.5 Flash can transcribe video (mp4, mov).
+    All videos are transcribed concurrently.
 
     Returns:
     [
@@ -85,10 +93,7 @@ def transcribe_video_responses(
     ]
     """
 
-    results = []
-
-    for idx, question in enumerate(interview_questions):
-
+    async def transcribe(idx, question):
         if idx < len(video_responses) and video_responses[idx]:
             print(f"🎬 Transcribing video for Q{idx+1} using Gemini 1.5 Flash...")
 
@@ -96,18 +101,22 @@ def transcribe_video_responses(
 
             try:
                 # Perform real transcription using Gemini
-                response = model.generate_content(
-                    [
-                        {
-                            "mime_type": "video/mp4",
-                            "data": video_bytes,
-                        },
-                        "Transcribe everything spoken in this video. "
-                        "Return ONLY the transcription text. No commentary.",
-                    ],
-                    generation_config={
-                        "temperature": 0.0,
-                    },
+                response = await llm_client.call(
+                    GEMINI_MODEL,
+                    lambda: get_llm_backend().generate(
+                        GEMINI_MODEL,
+                        [
+                            {
+                                "mime_type": "video/mp4",
+                                "data": video_bytes,
+                            },
+                            "Transcribe everything spoken in this video. "
+                            "Return ONLY the transcription text. No commentary.",
+                        ],
+                        temperature=0.0,
+                    ),
+                    label=f"Transcription Q{idx+1}",
+                    stage="transcription",
                 )
 
                 transcription = response.text.strip()
@@ -122,23 +131,25 @@ def transcribe_video_responses(
         else:
             transcription = "[No response provided]"
 
-        results.append(
-            {
-                "question": question,
-                "transcription": transcription,
-            }
-        )
-
         print(f"   ✅ Q{idx+1} Transcription length: {len(transcription)} characters")
         print(f"       Transcript Preview: {transcription}...")
 
-    return results
+        return {
+            "question": question,
+            "transcription": transcription,
+        }
+
+    return list(
+        await asyncio.gather(
+            *(transcribe(idx, question) for idx, question in enumerate(interview_questions))
+        )
+    )
 
 
 # --------------------------------------------------
 # STRICT RESPONSE ANALYSIS (PER-ANSWER)
 # --------------------------------------------------
-def analyze_single_response(
+async def analyze_single_response(
     question: str, transcription: str, code_context: str
 ) -> Dict:
     """
@@ -205,13 +216,17 @@ Return ONLY valid JSON:
 """
 
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.2,
-                "max_output_tokens": 300,
-                "response_mime_type": "application/json",
-            },
+        response = await llm_client.call(
+            GEMINI_MODEL,
+            lambda: get_llm_backend().generate(
+                GEMINI_MODEL,
+                [prompt],
+                schema=RESPONSE_ANALYSIS_SCHEMA,
+                temperature=0.2,
+                max_output_tokens=300,
+            ),
+            label="Response analysis",
+            stage="response_analysis",
         )
 
         import json
@@ -224,6 +224,9 @@ const CandidateFlow = ({ onBack }) => {
             setApplicationData({ ...applicationData, ...data });
             setStep("interview");
           }}
+          onUpdate={(data) =>
+            setApplicationData((prev) => ({ ...prev, ...data }))
+          }
           onBack={() => setStep("apply")}
         />
       )}
@@ -738,7 +741,39 @@ const ApplyForm = ({ position, onNext, onBack }) => {
 };
 
 // ============ SUBMIT CODE ============
-const SubmitCode = ({ position, applicationData, onNext, onBack }) => {
+// Parses a text/event-stream response body, calling onEvent(event, data)
+const readEventStream = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const messages = buffer.split("\n\n");
+    buffer = messages.pop();
+
+    for (const message of messages) {
+      let event = "message";
+      let data = "";
+      for (const line of message.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      onEvent(event, data ? JSON.parse(data) : null);
+    }
+  }
+};
+
+const SubmitCode = ({
+  position,
+  applicationData,
+  onNext,
+  onUpdate,
+  onBack,
+}) => {
   const [repoLink, setRepoLink] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
@@ -759,7 +794,8 @@ const SubmitCode = ({ position, applicationData, onNext, onBack }) => {
       formData.append("jd_id", position.id);
       formData.append("resume_file", applicationData.resumeFile); // Send PDF directly
 
-      const response = await fetch(`${API_BASE_URL}/evaluate/start`, {
+      // Streamed variant: questions arrive before code fit / TTS finish
+      const response = await fetch(`${API_BASE_URL}/evaluate/start/stream`, {
         method: "POST",
         body: formData, // Send as FormData, not JSON
       });
@@ -769,13 +805,85 @@ const SubmitCode = ({ position, applicationData, onNext, onBack }) => {
         throw new Error(errorData.detail || "Failed to submit");
       }
 
-      const result = await response.json();
-      onNext({
-        ...applicationData,
-        ...result,
+      const result = {
+        interview_questions: [],
+        interview_audio: [],
+        mcq_questions: [],
+        // The server stores the session only on "complete"; the interview
+        // cannot be submitted before that
+        stage1_status: "streaming",
+        stage1_error: "",
+      };
+      let started = false;
+
+      // Once the interview has started this component is unmounted:
+      // errors are handed to TakeInterview instead of thrown
+      const fail = (message) => {
+        if (!started) throw new Error(message);
+        result.stage1_status = "error";
+        result.stage1_error = message;
+        onUpdate({ ...result });
+      };
+
+      await readEventStream(response, (event, data) => {
+        switch (event) {
+          case "started":
+            result.candidate_id = data.candidate_id;
+            result.jd_id = data.jd_id;
+            break;
+          case "code_quality":
+            result.code_quality_score = data.code_quality_score;
+            result.code_description = data.code_description;
+            break;
+          case "interview_question":
+            result.interview_questions[data.index] = data.question;
+            break;
+          case "mcq_questions":
+            result.mcq_questions = data.mcq_questions;
+            break;
+          case "interview_audio":
+            result.interview_audio = [...result.interview_audio, data];
+            break;
+          case "complete":
+            // Audio arrived clip by clip; keep that array, replacing it
+            // would interrupt playback
+            Object.assign(result, data, { interview_audio: result.interview_audio });
+            result.stage1_status = "complete";
+            break;
+          case "error":
+            fail(data.detail || "Evaluation failed");
+            return;
+          default:
+            break;
+        }
+
+        // Start the interview as soon as questions and MCQs exist, keep
+        // feeding the slow tail (audio, scores) in afterwards
+        if (
+          !started &&
+          result.interview_questions.length > 0 &&
+          result.mcq_questions.length > 0
+        ) {
+          started = true;
+          onNext({ ...applicationData, ...result });
+        } else if (started) {
+          onUpdate({ ...result });
+        }
       });
+
+      if (result.stage1_status === "streaming") {
+        fail("Connection lost before the evaluation finished");
+      }
     } catch (err) {
-      setError(err.message || "An error occurred");
+      if (started) {
+        // Stream dropped mid-way (network error)
+        onUpdate({
+          stage1_status: "error",
+          stage1_error: err.message || "Connection lost before the evaluation finished",
+        });
+      } else {
+        setError(err.message || "An error occurred");
+      }
     } finally {
       setLoading(false);
     }
@@ -890,6 +998,10 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
   const [loading, setLoading] = useState(false);
   const [recordingTime, setRecordingTime] = useState(0);
   const [cameraError, setCameraError] = useState("");
+  const [submitError, setSubmitError] = useState("");
+
+  // Stage 1 keeps streaming (scores, audio) while the interview runs
+  const stage1Status = applicationData.stage1_status || "complete";
 
   const createAudioUrl = (audioBase64, mimeType) => {
     if (!audioBase64) return null;
@@ -911,6 +1023,7 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
   const timerRef = useRef(null);
 
   const interviewQuestions = applicationData.interview_questions || [];
+  const interviewAudio = applicationData.interview_audio || [];
   const mcqQuestions = applicationData.mcq_questions || [];
 
   const [audioUrl, setAudioUrl] = useState(null);
@@ -919,7 +1032,10 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
 
   // Load audio when question changes
   useEffect(() => {
-    const q = interviewQuestions[currentQuestion];
+    // Audio clips stream in after the questions, possibly out of order
+    const q = interviewAudio.find(
+      (clip, i) => (clip.index ?? i) === currentQuestion
+    );
     if (!q?.audio_base64) {
       setAudioUrl(null);
       setIsPlaying(false);
@@ -941,7 +1057,7 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
         URL.revokeObjectURL(url);
       }
     };
-  }, [currentQuestion, interviewQuestions]);
+  }, [currentQuestion, interviewAudio]);
 
   const handlePlayAudio = async () => {
     if (!audioRef.current || !audioUrl) {
@@ -1032,7 +1148,9 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
   };
 
   const handleSubmit = async () => {
+    if (stage1Status !== "complete") return;
     setLoading(true);
+    setSubmitError("");
 
     const formData = new FormData();
     formData.append("candidate_id", applicationData.candidate_id);
@@ -1055,12 +1173,16 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
         }
       );
 
-      if (!response.ok) throw new Error("Failed to submit");
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || "Failed to submit");
+      }
 
       const result = await response.json();
       onComplete(result);
     } catch (err) {
       console.error(err);
+      setSubmitError(err.message || "Failed to submit");
     } finally {
       setLoading(false);
     }
@@ -1111,6 +1233,16 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
             </div>
           )}
 
+          {stage1Status === "error" && (
+            <div className="mb-6 p-4 bg-red-50 border border-red-200 rounded-lg flex items-start">
+              <AlertCircle className="w-5 h-5 text-red-600 mr-3 mt-0.5 flex-shrink-0" />
+              <span className="text-red-700">
+                Your code evaluation failed ({applicationData.stage1_error}).
+                Please go back and submit your repository again.
+              </span>
+            </div>
+          )}
+
           <div className="bg-purple-50 border border-purple-200 rounded-lg p-6 mb-6">
             <div className="flex items-start space-x-4">
               <Volume2 className="w-6 h-6 text-purple-600 mt-1 flex-shrink-0" />
@@ -1280,10 +1412,38 @@ const TakeInterview = ({ applicationData, onComplete, onBack }) => {
           ))}
         </div>
 
+        {stage1Status === "error" && (
+          <div className="mb-6 p-4 bg-red-50 border border-red-200 rounded-lg flex items-start">
+            <AlertCircle className="w-5 h-5 text-red-600 mr-3 mt-0.5 flex-shrink-0" />
+            <span className="text-red-700">
+              Your code evaluation failed ({applicationData.stage1_error}).
+              Please go back and submit your repository again.
+            </span>
+          </div>
+        )}
+
+        {stage1Status === "streaming" && (
+          <div className="mb-6 p-4 bg-purple-50 border border-purple-200 rounded-lg flex items-center">
+            <Loader className="w-5 h-5 text-purple-600 mr-3 animate-spin flex-shrink-0" />
+            <span className="text-purple-700">
+              Finishing your code evaluation, you can submit in a moment...
+            </span>
+          </div>
+        )}
+
+        {submitError && (
+          <div className="mb-6 p-4 bg-red-50 border border-red-200 rounded-lg flex items-start">
+            <AlertCircle className="w-5 h-5 text-red-600 mr-3 mt-0.5 flex-shrink-0" />
+            <span className="text-red-700">{submitError}</span>
+          </div>
+        )}
+
         <button
           onClick={handleSubmit}
           disabled={
-            loading || Object.keys(mcqAnswers).length < mcqQuestions.length
+            loading ||
+            stage1Status !== "complete" ||
+            Object.keys(mcqAnswers).length < mcqQuestions.length
           }
           className="w-full px-4 py-4 bg-green-600 text-white rounded-lg font-semibold hover:bg-green-700 transition disabled:bg-gray-300 disabled:cursor-not-allowed flex items-center justify-center text-lg"
         >
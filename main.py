@@ -1,12 +1,18 @@
 import os
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from app.api import app_router
+from app.qdrant_scorer import vector_writer, bootstrap_qdrant
 
 load_dotenv()
 
+# "background" (serve immediately, bootstrap concurrently), "blocking"
+# (finish before accepting requests) or "off"
+QDRANT_BOOTSTRAP = os.getenv("QDRANT_BOOTSTRAP", "background")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Micro-Apprenticeship Platform",
@@ -27,6 +33,21 @@ app.add_middleware(
 app.include_router(app_router, prefix="/api")
 
 
+@app.on_event("startup")
+async def bootstrap_vector_store():
+    # Scoring does not need the collections, only indexing/search does
+    if QDRANT_BOOTSTRAP == "blocking":
+        await bootstrap_qdrant()
+    elif QDRANT_BOOTSTRAP == "background":
+        app.state.qdrant_bootstrap = asyncio.create_task(bootstrap_qdrant())
+
+
+@app.on_event("shutdown")
+def flush_vector_writes():
+    # Write out queued code-fit vectors before the worker exits
+    vector_writer.flush()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "AI Micro-Apprenticeship Platform"}
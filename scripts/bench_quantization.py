@@ -0,0 +1,202 @@
+"""
+Recall vs latency of vector quantization settings on a synthetic corpus.
+
+Simulation (default, numpy only): float32 exact search is the ground
+truth; int8 scalar and binary quantization are emulated the way Qdrant
+does them (quantized scoring, oversampling, rescoring with the float
+originals). Latencies are numpy timings and only comparable with each
+other; recall and memory per vector carry over to Qdrant.
+
+Real Qdrant (--qdrant, needs QDRANT_URL / QDRANT_API_KEY): uploads the
+corpus into temporary collections, one per quantization mode, and
+measures recall and round-trip latency of query_points.
+
+Usage (from the repo root):
+    python scripts/bench_quantization.py --size 20000 --dim 384
+    python scripts/bench_quantization.py --size 20000 --qdrant
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+
+# -----------------------------
+# Synthetic corpus
+# -----------------------------
+def make_corpus(size: int, dim: int, queries: int, clusters: int, seed: int):
+    """
+    Clustered unit vectors (embeddings of similar resumes cluster too)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+
+    def sample(n):
+        points = centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.8, size=(n, dim)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return np.ascontiguousarray(sample(size)), np.ascontiguousarray(sample(queries))
+
+
+def top_k(scores, k):
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def recall(found, truth) -> float:
+    return len(set(found.tolist()) & set(truth.tolist())) / len(truth)
+
+
+# -----------------------------
+# Quantizers (Qdrant-style)
+# -----------------------------
+class ScalarInt8:
+    name = "scalar"
+
+    def __init__(self, corpus, quantile=0.99):
+        self.low, self.high = np.quantile(corpus, [1 - quantile, quantile])
+        self.step = (self.high - self.low) / 255
+        self.codes = np.clip(np.round((corpus - self.low) / self.step), 0, 255).astype(np.uint8)
+        self.bytes_per_vector = corpus.shape[1]
+
+    def scores(self, query):
+        # Dequantized dot product: step * codes.q + low * sum(q)
+        return self.step * (self.codes @ query) + self.low * query.sum()
+
+
+class Binary:
+    name = "binary"
+
+    def __init__(self, corpus):
+        self.bits = np.packbits(corpus > 0, axis=1)
+        self.popcount = np.array([bin(i).count("1") for i in range(256)], dtype=np.int32)
+        self.bytes_per_vector = self.bits.shape[1]
+
+    def scores(self, query):
+        query_bits = np.packbits(query > 0)
+        # Fewer differing bits = more similar
+        return -self.popcount[np.bitwise_xor(self.bits, query_bits)].sum(axis=1)
+
+
+def bench_simulated(corpus, queries, k, oversampling_factors):
+    truth = [top_k(corpus @ q, k) for q in queries]
+    rows = []
+
+    def run(name, bytes_per_vector, search):
+        latencies, recalls = [], []
+        for q, expected in zip(queries, truth):
+            started = time.perf_counter()
+            found = search(q)
+            latencies.append(time.perf_counter() - started)
+            recalls.append(recall(found, expected))
+        rows.append((name, bytes_per_vector, np.mean(recalls), np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000))
+
+    run("float32 exact", corpus.shape[1] * 4, lambda q: top_k(corpus @ q, k))
+
+    for quantizer in (ScalarInt8(corpus), Binary(corpus)):
+        run(f"{quantizer.name} no rescore", quantizer.bytes_per_vector, lambda q: top_k(quantizer.scores(q), k))
+
+        for factor in oversampling_factors:
+            def search(q, factor=factor):
+                candidates = top_k(quantizer.scores(q), min(len(corpus), int(k * factor)))
+                # Rescore with the originals (on disk in Qdrant)
+                return candidates[top_k(corpus[candidates] @ q, k)]
+
+            run(f"{quantizer.name} x{factor:g} + rescore", quantizer.bytes_per_vector, search)
+
+    return rows
+
+
+# -----------------------------
+# Real Qdrant
+# -----------------------------
+def bench_qdrant(corpus, queries, k, oversampling_factors, keep: bool = False):
+    from qdrant_client import QdrantClient, models
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    client = QdrantClient(url=os.environ["QDRANT_URL"], api_key=os.environ.get("QDRANT_API_KEY"))
+    truth = [top_k(corpus @ q, k) for q in queries]
+    rows = []
+
+    modes = {
+        "none": None,
+        "scalar": models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)),
+        "binary": models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True)),
+    }
+
+    for mode, quantization in modes.items():
+        name = f"bench_quantization_{mode}"
+        if client.collection_exists(name):
+            client.delete_collection(name)
+
+        client.create_collection(
+            collection_name=name,
+            vectors_config=models.VectorParams(size=corpus.shape[1], distance=models.Distance.COSINE, on_disk=quantization is not None),
+            quantization_config=quantization,
+        )
+        client.upload_collection(collection_name=name, vectors=corpus, ids=range(len(corpus)), batch_size=256)
+
+        while client.get_collection(name).status != models.CollectionStatus.GREEN:
+            time.sleep(1)
+
+        settings = [("exact", None)] if quantization is None else [
+            (f"x{factor:g} + rescore", models.SearchParams(quantization=models.QuantizationSearchParams(rescore=True, oversampling=factor)))
+            for factor in oversampling_factors
+        ] + [("no rescore", models.SearchParams(quantization=models.QuantizationSearchParams(rescore=False)))]
+
+        for label, params in settings:
+            latencies, recalls = [], []
+            for q, expected in zip(queries, truth):
+                started = time.perf_counter()
+                hits = client.query_points(collection_name=name, query=q.tolist(), limit=k, search_params=params).points
+                latencies.append(time.perf_counter() - started)
+                recalls.append(recall(np.array([hit.id for hit in hits]), expected))
+            rows.append((f"qdrant {mode} {label}", None, np.mean(recalls), np.percentile(latencies, 50) * 1000, np.percentile(latencies, 95) * 1000))
+
+        if not keep:
+            client.delete_collection(name)
+
+    return rows
+
+
+def print_table(title, rows, k):
+    print(f"\n📊 {title}")
+    print(f"   {'setting':<32} {'RAM/vector':>10} {f'recall@{k}':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, size, rec, p50, p95 in rows:
+        size = f"{size} B" if size is not None else "-"
+        print(f"   {name:<32} {size:>10} {rec:>10.3f} {p50:>8.3f} {p95:>8.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark quantization recall vs latency")
+    parser.add_argument("--size", type=int, default=20000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversampling", default="1,2,4", help="Comma-separated factors")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--qdrant", action="store_true", help="Also benchmark a real Qdrant")
+    parser.add_argument("--keep", action="store_true", help="Keep the Qdrant benchmark collections")
+    args = parser.parse_args(argv)
+
+    factors = [float(f) for f in args.oversampling.split(",") if f.strip()]
+    corpus, queries = make_corpus(args.size, args.dim, args.queries, args.clusters, args.seed)
+    print(f"🧪 {args.size} vectors x {args.dim} dims, {args.queries} queries, k={args.k}")
+
+    print_table("Simulated (numpy)", bench_simulated(corpus, queries, args.k, factors), args.k)
+
+    if args.qdrant:
+        print_table("Qdrant", bench_qdrant(corpus, queries, args.k, factors, keep=args.keep), args.k)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Exercises the GitHub request scheduler (app/github_fetcher.py) against a
+local stub of the GitHub API, no network or real tokens needed:
+
+- rotation: a token answering 403 + X-RateLimit-Remaining: 0 is parked
+  until its reset and the next token serves the request
+- secondary limits: 429 + Retry-After is waited out, then retried
+- queueing: with every token exhausted, callers wait for the reset
+  (or fail fast when the reset is beyond max_queue_wait)
+
+Usage (from the repo root):
+    python scripts/check_github_scheduler.py
+"""
+import os
+import sys
+import time
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.github_fetcher import GitHubRequestScheduler  # noqa: E402
+
+
+# -----------------------------
+# Stub GitHub API
+# -----------------------------
+class StubGitHub:
+    """
+    Per-token scripted responses: {token: [(status, headers), ...]}; the
+    last entry repeats. Every request is logged as (token, status).
+    """
+
+    def __init__(self):
+        self.scripts = {}
+        self.log = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                token = self.headers.get("Authorization", "").replace("Bearer ", "") or None
+                with stub._lock:
+                    script = stub.scripts.get(token) or [(200, {})]
+                    status, headers = script.pop(0) if len(script) > 1 else script[0]
+                    stub.log.append((token, status))
+
+                body = b'{"message": "API rate limit exceeded"}' if status != 200 else b"{}"
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self, scripts: dict):
+        with self._lock:
+            self.scripts = scripts
+            self.log = []
+
+    def close(self):
+        self.server.shutdown()
+
+
+def rate_headers(remaining: int, reset_in: float, limit: int = 5000) -> dict:
+    return {
+        "X-RateLimit-Limit": limit,
+        "X-RateLimit-Remaining": remaining,
+        "X-RateLimit-Reset": int(time.time() + reset_in),
+    }
+
+
+# -----------------------------
+# Checks
+# -----------------------------
+def check_rotation(stub):
+    stub.reset({
+        "tok-a": [(403, rate_headers(0, 3600))],
+        "tok-b": [(200, rate_headers(100, 3600))],
+    })
+    scheduler = GitHubRequestScheduler(tokens=["tok-a", "tok-b"], http_session=requests.Session(), api_url=stub.url)
+
+    first = scheduler.request(f"{stub.url}/repos/o/r")
+    second = scheduler.request(f"{stub.url}/repos/o/r")
+
+    assert first.status_code == 200 and second.status_code == 200, (first.status_code, second.status_code)
+    # tok-a may be probed once, never again once it is known to be exhausted
+    assert [token for token, _ in stub.log].count("tok-a") <= 1, stub.log
+    assert stub.log[-1] == ("tok-b", 200), stub.log
+    return f"requests: {stub.log}"
+
+
+def check_retry_after(stub):
+    stub.reset({
+        "tok-a": [(429, {"Retry-After": 1}), (200, rate_headers(100, 3600))],
+    })
+    scheduler = GitHubRequestScheduler(tokens=["tok-a"], http_session=requests.Session(), api_url=stub.url)
+
+    started = time.monotonic()
+    resp = scheduler.request(f"{stub.url}/repos/o/r")
+    elapsed = time.monotonic() - started
+
+    assert resp.status_code == 200, resp.status_code
+    assert stub.log == [("tok-a", 429), ("tok-a", 200)], stub.log
+    # Retry-After: 1 plus full jitter -> between 1 and 2 seconds
+    assert 1.0 <= elapsed < 3.0, elapsed
+    return f"waited {elapsed:.2f}s"
+
+
+def check_queue_until_reset(stub):
+    stub.reset({
+        "tok-a": [(200, rate_headers(0, 2)), (200, rate_headers(100, 3600))],
+    })
+    scheduler = GitHubRequestScheduler(tokens=["tok-a"], http_session=requests.Session(), api_url=stub.url, max_queue_wait=10)
+
+    scheduler.request(f"{stub.url}/repos/o/r")
+    started = time.monotonic()
+    resp = scheduler.request(f"{stub.url}/repos/o/r")
+    elapsed = time.monotonic() - started
+
+    assert resp.status_code == 200, resp.status_code
+    # X-RateLimit-Reset has 1s resolution
+    assert 0.5 <= elapsed < 4.0, elapsed
+    return f"queued {elapsed:.2f}s"
+
+
+def check_queue_limit(stub):
+    stub.reset({
+        "tok-a": [(200, rate_headers(0, 3600))],
+    })
+    scheduler = GitHubRequestScheduler(tokens=["tok-a"], http_session=requests.Session(), api_url=stub.url, max_queue_wait=1)
+
+    scheduler.request(f"{stub.url}/repos/o/r")
+    assert not scheduler.has_capacity()
+
+    try:
+        scheduler.request(f"{stub.url}/repos/o/r")
+    except RuntimeError as e:
+        return f"rejected: {e}"
+    raise AssertionError("request past max_queue_wait was not rejected")
+
+
+CHECKS = [
+    ("token rotation on X-RateLimit-Remaining: 0", check_rotation),
+    ("429 + Retry-After back-off", check_retry_after),
+    ("queueing until the rate-limit reset", check_queue_until_reset),
+    ("fail fast beyond max_queue_wait", check_queue_limit),
+]
+
+
+def main(argv=None):
+    stub = StubGitHub()
+    print(f"🧪 Stub GitHub API on {stub.url}")
+
+    failures = 0
+    try:
+        for name, check in CHECKS:
+            try:
+                detail = check(stub)
+                print(f"   ✅ {name} ({detail})")
+            except AssertionError as e:
+                failures += 1
+                print(f"   ❌ {name}: {e}")
+    finally:
+        stub.close()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Measures worker startup cost:
+
+- import time of main (median of several fresh interpreters)
+- the slowest app.* modules, from python -X importtime
+- time to first request: spawn uvicorn, poll /health until it answers
+
+Usage (from the repo root):
+    python scripts/measure_startup.py --runs 5 --port 8765
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def slowest_modules(module: str, prefix: str = "app", limit: int = 10) -> list:
+    """
+    [(cumulative seconds, module), ...] from -X importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:  self_us | cumulative_us | <indent>module"
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name == module or name == prefix or name.startswith(prefix + "."):
+            rows.append((int(cumulative) / 1e6, name))
+
+    return sorted(rows, reverse=True)[:limit]
+
+
+def time_to_first_request(port: int, timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError(f"No response within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and time to first request")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args(argv)
+
+    timings = time_import(args.module, args.runs)
+    print(f"⏱️  import {args.module}: median {statistics.median(timings):.3f}s "
+          f"(min {min(timings):.3f}s, max {max(timings):.3f}s, {args.runs} runs, interpreter start included)")
+
+    print("\n🐢 Slowest app modules (cumulative):")
+    for seconds, name in slowest_modules(args.module):
+        print(f"   {seconds:7.3f}s  {name}")
+
+    if not args.skip_server:
+        seconds = time_to_first_request(args.port)
+        print(f"\n🚀 Time to first request: {seconds:.3f}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())